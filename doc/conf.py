@@ -21,8 +21,8 @@ project = "pycl_fft"
 copyright = "2021, Zachary J Weiner"
 author = "Zachary J Weiner"
 
-import pkg_resources
-version = pkg_resources.get_distribution("pycl_fft").version
+from importlib import metadata
+version = metadata.version("pycl_fft")
 release = version
 
 # -- General configuration ---------------------------------------------------
@@ -62,11 +62,12 @@ html_static_path = ["_static"]
 
 intersphinx_mapping = {
     "python": ("https://docs.python.org/3", None),
-    "numpy": ("https://docs.scipy.org/doc/numpy/", None),
-    "scipy": ("https://docs.scipy.org/doc/scipy/reference/", None),
+    "numpy": ("https://numpy.org/doc/stable/", None),
+    "scipy": ("https://docs.scipy.org/doc/scipy/", None),
     "pyopencl": ("https://documen.tician.de/pyopencl", None),
     "pytest": ("https://docs.pytest.org/en/latest/", None),
 }
+intersphinx_timeout = 10
 
 latex_elements = {
     "maxlistdepth": "99",
@@ -75,12 +76,18 @@ latex_elements = {
 # autodoc_mock_imports = ["sympy"]
 
 import os
+import inspect
 on_rtd = os.environ.get("READTHEDOCS") == "True"
 
 
 # setup copy button thing
 def setup(app):
     app.add_config_value("on_rtd", on_rtd, "env")
+    # linkcode_resolve only reads module state, so builds may run in parallel
+    return {
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
 
 
 doctest_global_setup = """
@@ -92,20 +99,41 @@ copybutton_prompt_text = r">>> |\.\.\. |\$ |In \[\d*\]: | {2,5}\.\.\.: | {5,8}:
 copybutton_prompt_is_regexp = True
 
 import sys
-import inspect
+from functools import lru_cache
 
 linkcode_revision = "main"
 linkcode_url = "https://github.com/zachjweiner/pycl-fft/blob/" \
                + linkcode_revision + "/{filepath}#L{linestart}-L{linestop}"
 
 
+@lru_cache(maxsize=None)
+def _get_source_root(topmodulename):
+    topmodule = sys.modules[topmodulename]
+    return os.path.dirname(os.path.dirname(topmodule.__file__))
+
+
+# many documented names resolve to the same objects, so cache source lookups
+# (which stat and read files) per object
+@lru_cache(maxsize=None)
+def _get_source_file(obj):
+    return inspect.getsourcefile(obj)
+
+
+@lru_cache(maxsize=None)
+def _get_source_lines(obj):
+    return inspect.getsourcelines(obj)
+
+
 def linkcode_resolve(domain, info):
     if domain != "py" or not info["module"]:
         return None
 
-    modname = info["module"]
+    return _resolve(info["module"], info["fullname"])
+
+
+@lru_cache(maxsize=None)
+def _resolve(modname, fullname):
     topmodulename = modname.split(".")[0]
-    fullname = info["fullname"]
 
     submod = sys.modules.get(modname)
     if submod is None:
@@ -118,17 +146,23 @@ def linkcode_resolve(domain, info):
         except Exception:
             return None
 
+    # link to the source of decorated objects rather than their wrappers
     try:
-        modpath = pkg_resources.require(topmodulename)[0].location
-        filepath = os.path.relpath(inspect.getsourcefile(obj), modpath)
+        obj = inspect.unwrap(obj)
+    except ValueError:
+        return None
+
+    try:
+        modpath = _get_source_root(topmodulename)
+        filepath = os.path.relpath(_get_source_file(obj), modpath)
         if filepath is None:
             return
     except Exception:
         return None
 
     try:
-        source, lineno = inspect.getsourcelines(obj)
-    except OSError:
+        source, lineno = _get_source_lines(obj)
+    except (OSError, TypeError):
         return None
     else:
         linestart, linestop = lineno, lineno + len(source) - 1
@@ -137,10 +171,6 @@ def linkcode_resolve(domain, info):
         filepath=filepath, linestart=linestart, linestop=linestop)
 
 
-import pycl_fft
-pycl_fft.clfft.Transform = pycl_fft.clfft.Transform.__wrapped__
-pycl_fft.vkfft.Transform = pycl_fft.vkfft.Transform.__wrapped__
-
 rst_prolog = """
 .. |vkfft| replace:: :mod:`VkFFT`
 .. _vkfft: https://github.com/DTolm/VkFFT
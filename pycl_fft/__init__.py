@@ -21,15 +21,14 @@ THE SOFTWARE.
 """
 
 
+import os
+import sys
+from math import prod
+from functools import lru_cache
 import pyopencl.array as cla
 from pycl_fft.util import (
     r2c_dtype_map, c2r_dtype_map, get_r2c_output_shape, get_c2r_output_shape,
     is_in_place)
-import pycl_fft.vkfft
-try:
-    import pycl_fft.clfft
-except ModuleNotFoundError:
-    pass
 
 
 __doc__ = """
@@ -46,13 +45,20 @@ However, by default, they are minimally destructive at the expense of extra memo
 allocations, and therefore performance.
 For example, if you only pass an ``input`` array, an ``output`` array is allocated
 and returned so that ``input`` is not implicitly overwritten.
-(For :func:`irfftn`, a further allocation of a temporary buffer is also required
-for out-of-place transforms.)
-To avoid this expense, allocate and pass an ``output`` array yourself, or pass a
-:class:`pyopencl.tools.MemoryPool` ``allocator``.
-
-Furthermore, to opt in to in-place transforms, pass the same array as ``input`` and
-``output``.
+(For :func:`irfftn` with the ``"vkfft"`` backend, a further allocation of a
+temporary buffer is also required for out-of-place transforms.)
+To avoid this expense, allocate and pass an ``output`` array yourself.
+If no ``allocator`` is passed, arrays are allocated from a
+:class:`pyopencl.tools.MemoryPool` (one per context) so that repeated calls
+reuse device memory.
+Each pool keeps its context (and the queue it was created for) alive until
+released by :func:`clear_cache`.
+Set the environment variable ``PYCL_FFT_DISABLE_POOL=1`` to allocate directly
+from the OpenCL runtime instead.
+
+Furthermore, to opt in to in-place transforms, pass ``in_place=True`` (or,
+equivalently, the same array as ``input`` and ``output``), in which case no output
+array is allocated (and passing any other ``output`` raises a :class:`ValueError`).
 For :func:`rfftn` and :func:`irfftn`, the real array must be padded.
 Namely, :func:`rfftn` assumes that the length of the last axis of the input (real)
 array is two longer than that of the transform to be performed, and :func:`irfftn`
@@ -65,7 +71,10 @@ Batching is supported in a similar manner to :func:`scipy.fft.fftn` via the
 The |vkfft|_ backend supports array dimensions up to four and batching along any
 axis (excluding the first axis for four-dimensional arrays and also the last axis
 for real-to-complex/complex-to-real transforms).
-The |clfft|_ backend only supports batching along the first axis.
+The |clfft|_ backend only supports batching along leading axes (i.e., transforms
+over the last one to three axes).
+In either case, all leading axes which are not transformed are batched over by a
+single launch.
 
 Both the |vkfft|_ and |clfft|_ backends are supported, which one may choose
 between by passing ``backend="vkfft"`` (the default) or ``backend="clfft"``.
@@ -78,11 +87,21 @@ between by passing ``backend="vkfft"`` (the default) or ``backend="clfft"``.
 .. autofunction:: idctn
 
 .. autofunction:: set_backend
+.. autofunction:: clear_cache
 """
 
 default_backend = "vkfft"
 
 
+def __getattr__(name):
+    # the backend modules load (and initialize) their respective libraries, so
+    # only import them on first access
+    if name in ("vkfft", "clfft"):
+        from importlib import import_module
+        return import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def set_backend(backend):
     """
     Set the default backend for transforms to one of ``"vkfft"`` (the default)
@@ -94,31 +113,98 @@ def set_backend(backend):
 
 
 def clear_cache():
-    import pycl_fft.vkfft as vkf
-    vkf.Transform.cache_clear()  # pylint: disable=E1101
+    """
+    Clear the caches of :class:`~pycl_fft.vkfft.Transform`\\ s and
+    :class:`~pycl_fft.clfft.Transform`\\ s (and of the |clfft|_ plans the latter
+    share) and release the memory pools used by the high-level interface (along
+    with the references they hold to :class:`pyopencl.Context`\\ s).
+    """
+
+    # backends which haven't been imported have nothing cached
+    for name in ("vkfft", "clfft"):
+        module = sys.modules.get(f"{__name__}.{name}")
+        if module is not None:
+            module.Transform.cache_clear()
+
+    if f"{__name__}.clfft" in sys.modules:
+        sys.modules[f"{__name__}.clfft"].clear_plan_cache()
+
+    _memory_pools.clear()
+
+
+_use_memory_pool = os.environ.get("PYCL_FFT_DISABLE_POOL", "0") != "1"
+# pools hold their allocator's queue (and thereby its context), so a
+# WeakKeyDictionary would not release them either; see clear_cache
+_memory_pools = {}
+
+
+def _get_allocator(queue, allocator):
+    if allocator is not None or not _use_memory_pool:
+        return allocator
+
     try:
-        import pycl_fft.clfft as clf
-        clf.Transform.cache_clear()  # pylint: disable=E1101
-    except ModuleNotFoundError:
-        pass
+        return _memory_pools[queue.context]
+    except KeyError:
+        from pyopencl.tools import MemoryPool, ImmediateAllocator
+        pool = MemoryPool(ImmediateAllocator(queue))
+        _memory_pools[queue.context] = pool
+        return pool
+
+
+_transform_classes = {}
 
 
 def get_transform_class(backend):
-    global default_backend
     backend = backend or default_backend
+    try:
+        return _transform_classes[backend]
+    except KeyError:
+        pass
+
     if backend == "vkfft":
-        return pycl_fft.vkfft.Transform
+        from pycl_fft.vkfft import Transform
     elif backend == "clfft":
-        return pycl_fft.clfft.Transform
+        from pycl_fft.clfft import Transform
     else:
         raise NotImplementedError(f"Transforms for backend {backend}.")
 
+    _transform_classes[backend] = Transform
+    return Transform
+
+
+def _get_transform(backend, ctx, shape, dtype, type, in_place, axes, nbatch):
+    # pass all arguments in a fixed order so that every high-level function maps
+    # onto the same entries of the backend's Transform cache
+    Transform = get_transform_class(backend)
+    return Transform(
+        ctx, shape, dtype, type=type, in_place=in_place, axes=axes, nbatch=nbatch)
+
+
+def _check_dct_backend(backend):
+    # DCTs default to vkfft regardless of default_backend
+    if backend not in (None, "vkfft"):
+        raise NotImplementedError("Only the vkfft backend supports dctn.")
+
+
+def _check_in_place_output(input, output):
+    # an output other than input would otherwise be silently ignored
+    if output is not None and not is_in_place(input, output):
+        raise ValueError(
+            "output must be input (or None) for in-place transforms.")
+
 
 def _process_shape_and_axes(shape, axes):
     """
     :returns: shape, axes, nbatch
     """
 
+    # axes may be passed as any iterable, so normalize for the cache
+    return _process_shape_and_axes_cached(
+        tuple(shape), None if axes is None else tuple(axes))
+
+
+@lru_cache(maxsize=256)
+def _process_shape_and_axes_cached(shape, axes):
     if axes is None:
         # if invalid,
         return shape, axes, 1
@@ -131,41 +217,59 @@ def _process_shape_and_axes(shape, axes):
                 "Can't transform along first dimension of 4D arrays.")
         return shape, axes, 1
     else:
-        axes = tuple(ax - 1 for ax in axes)
-        return shape[1:], axes, shape[0]
+        # fold all leading, untransformed axes into a single batch dimension so
+        # that all transforms are performed by one launch
+        nlead = min(axes)
+        axes = tuple(ax - nlead for ax in axes)
+        return shape[nlead:], axes, prod(shape[:nlead])
 
 
 def fftn(input: cla.Array, output: cla.Array = None, temp: cla.Array = None,
-         allocator=None, backend=None, axes: tuple = None):
-    if output is None:
+         allocator=None, backend=None, axes: tuple = None,
+         in_place: bool = False):
+    if in_place:
+        _check_in_place_output(input, output)
+        output = input
+    elif output is None:
+        allocator = _get_allocator(input.queue, allocator)
         output = cla.empty_like(input, allocator=allocator)
+    else:
+        in_place = is_in_place(input, output)
 
     shape, axes, nbatch = _process_shape_and_axes(input.shape, axes)
-    Transform = get_transform_class(backend)
-    transform = Transform(
-        input.context, shape, input.dtype, in_place=is_in_place(input, output),
-        axes=axes, nbatch=nbatch)
+    transform = _get_transform(
+        backend, input.context, shape, input.dtype, "c2c", in_place, axes, nbatch)
 
     return transform.forward(input=input, output=output, temp=temp)
 
 
 def ifftn(input: cla.Array, output: cla.Array = None, temp: cla.Array = None,
-          allocator=None, backend=None, axes: tuple = None):
-    if output is None:
+          allocator=None, backend=None, axes: tuple = None,
+          in_place: bool = False):
+    if in_place:
+        _check_in_place_output(input, output)
+        output = input
+    elif output is None:
+        allocator = _get_allocator(input.queue, allocator)
         output = cla.empty_like(input, allocator=allocator)
+    else:
+        in_place = is_in_place(input, output)
 
     shape, axes, nbatch = _process_shape_and_axes(input.shape, axes)
-    Transform = get_transform_class(backend)
-    transform = Transform(
-        input.context, shape, input.dtype, in_place=is_in_place(input, output),
-        axes=axes, nbatch=nbatch)
+    transform = _get_transform(
+        backend, input.context, shape, input.dtype, "c2c", in_place, axes, nbatch)
 
     return transform.backward(input=input, output=output, temp=temp)
 
 
 def rfftn(input: cla.Array, output: cla.Array = None, temp: cla.Array = None,
-          allocator=None, backend=None, axes: tuple = None):
-    in_place = is_in_place(input, output)
+          allocator=None, backend=None, axes: tuple = None,
+          in_place: bool = False):
+    if in_place:
+        _check_in_place_output(input, output)
+        output = input
+    elif output is not None:
+        in_place = is_in_place(input, output)
     cdtype = r2c_dtype_map[input.dtype]
 
     shape, axes, nbatch = _process_shape_and_axes(input.shape, axes)
@@ -174,13 +278,13 @@ def rfftn(input: cla.Array, output: cla.Array = None, temp: cla.Array = None,
         shape = shape[:-1] + (shape[-1] - 2,)
 
     if output is None:
+        allocator = _get_allocator(input.queue, allocator)
+        batch_shape = input.shape[:input.ndim-len(shape)]
         output = cla.empty(
-            input.queue, (nbatch,)+cshape, cdtype, allocator=allocator)
+            input.queue, batch_shape+cshape, cdtype, allocator=allocator)
 
-    Transform = get_transform_class(backend)
-    transform = Transform(
-        input.context, shape, input.dtype, in_place=in_place, type="r2c",
-        axes=axes, nbatch=nbatch)
+    transform = _get_transform(
+        backend, input.context, shape, input.dtype, "r2c", in_place, axes, nbatch)
 
     result = transform.forward(input=input, output=output, temp=temp)
     if in_place:
@@ -190,24 +294,30 @@ def rfftn(input: cla.Array, output: cla.Array = None, temp: cla.Array = None,
 
 
 def irfftn(input: cla.Array, output: cla.Array = None, temp: cla.Array = None,
-           allocator=None, backend=None, axes: tuple = None):
-    in_place = is_in_place(input, output)
+           allocator=None, backend=None, axes: tuple = None,
+           in_place: bool = False):
+    if in_place:
+        _check_in_place_output(input, output)
+        output = input
+    elif output is not None:
+        in_place = is_in_place(input, output)
     rdtype = c2r_dtype_map[input.dtype]
 
     shape, axes, nbatch = _process_shape_and_axes(input.shape, axes)
     shape = get_c2r_output_shape(shape)
 
+    transform = _get_transform(
+        backend, input.context, shape, rdtype, "c2r", in_place, axes, nbatch)
+
+    allocator = _get_allocator(input.queue, allocator)
     if output is None:
+        batch_shape = input.shape[:input.ndim-len(shape)]
         output = cla.empty(
-            input.queue, (nbatch,)+shape, rdtype, allocator=allocator)
-    if not in_place and temp is None:
+            input.queue, batch_shape+shape, rdtype, allocator=allocator)
+    # only allocate scratch space for backends which require it
+    if transform.separate_buffer_required and temp is None:
         temp = cla.empty_like(input, allocator=allocator)
 
-    Transform = get_transform_class(backend)
-    transform = Transform(
-        input.context, shape, rdtype, in_place=in_place, type="c2r",
-        axes=axes, nbatch=nbatch)
-
     result = transform.backward(input=input, output=output, temp=temp)
     if in_place:
         return result.view(dtype=rdtype)
@@ -216,33 +326,43 @@ def irfftn(input: cla.Array, output: cla.Array = None, temp: cla.Array = None,
 
 
 def dctn(input: cla.Array, output: cla.Array = None, type: int = 2,
-         temp: cla.Array = None, allocator=None, backend=None, axes: tuple = None):
-    if output is None:
-        output = cla.empty_like(input, allocator=allocator)
+         temp: cla.Array = None, allocator=None, backend=None, axes: tuple = None,
+         in_place: bool = False):
+    _check_dct_backend(backend)
 
-    if backend is not None and backend != "vkfft":
-        raise NotImplementedError("Only the vkfft backend supports dctn.")
+    if in_place:
+        _check_in_place_output(input, output)
+        output = input
+    elif output is None:
+        allocator = _get_allocator(input.queue, allocator)
+        output = cla.empty_like(input, allocator=allocator)
+    else:
+        in_place = is_in_place(input, output)
 
     shape, axes, nbatch = _process_shape_and_axes(input.shape, axes)
-    transform = pycl_fft.vkfft.Transform(
-        input.context, shape, input.dtype, in_place=is_in_place(input, output),
-        type=type, axes=axes, nbatch=nbatch)
+    transform = _get_transform(
+        "vkfft", input.context, shape, input.dtype, type, in_place, axes, nbatch)
 
     return transform.forward(input=input, output=output, temp=temp)
 
 
 def idctn(input: cla.Array, output: cla.Array = None, type: int = 2,
-          temp: cla.Array = None, allocator=None, backend=None, axes: tuple = None):
-    if output is None:
-        output = cla.empty_like(input, allocator=allocator)
+          temp: cla.Array = None, allocator=None, backend=None, axes: tuple = None,
+          in_place: bool = False):
+    _check_dct_backend(backend)
 
-    if backend is not None and backend != "vkfft":
-        raise NotImplementedError("Only the vkfft backend supports dctn.")
+    if in_place:
+        _check_in_place_output(input, output)
+        output = input
+    elif output is None:
+        allocator = _get_allocator(input.queue, allocator)
+        output = cla.empty_like(input, allocator=allocator)
+    else:
+        in_place = is_in_place(input, output)
 
     shape, axes, nbatch = _process_shape_and_axes(input.shape, axes)
-    transform = pycl_fft.vkfft.Transform(
-        input.context, shape, input.dtype, in_place=is_in_place(input, output),
-        type=type, axes=axes, nbatch=nbatch)
+    transform = _get_transform(
+        "vkfft", input.context, shape, input.dtype, type, in_place, axes, nbatch)
 
     return transform.backward(input=input, output=output, temp=temp)
 
@@ -21,7 +21,11 @@ THE SOFTWARE.
 """
 
 
+import os
+import math
 import atexit
+import weakref
+import threading
 from functools import lru_cache
 import numpy as np
 import pyopencl as cl
@@ -40,7 +44,9 @@ from pycl_fft._clfft import (
     teardown as _teardown,
     __version__,
 )
-from pycl_fft.util import get_c2r_output_shape, get_r2c_output_shape, get_c_strides
+from pycl_fft.util import (
+    BatchedTransformMixIn, get_c2r_output_shape, get_r2c_output_shape,
+    get_reversed_c_strides, is_in_place)
 
 import logging
 logger = logging.getLogger(__name__)
@@ -153,6 +159,18 @@ Plans
     Registered as an exit hook via :mod:`atexit` upon module import; shouldn't have
     to be called by the user.
 
+Plan cache
+----------
+
+:class:`~pycl_fft.clfft.Transform`\\ s with identical plan parameters (and no
+additional keyword arguments) share a single :class:`Plan`, held in a
+least-recently-used cache of (by default) 16 plans.
+Set the environment variable ``PYCL_FFT_PLAN_CACHE_SIZE`` to change its size.
+
+.. autofunction:: clear_plan_cache
+.. autofunction:: plan_cache_info
+.. autofunction:: set_work_area_size_limit
+
 Constants
 ---------
 
@@ -233,10 +251,26 @@ except RuntimeError as e:
     raise clFFTError(_get_error_code(e))
 
 torn_down = False
+_live_plans = weakref.WeakSet()
+
+# bound once to avoid looking up enum members on every transform
+_FORWARD = Direction.FORWARD
+_BACKWARD = Direction.BACKWARD
 
 
 @atexit.register
 def teardown():
+    clear_plan_cache()
+    # destroy any plans which are still alive while clFFT is still set up,
+    # rather than relying on the order in which they are garbage collected
+    for plan in list(_live_plans):
+        try:
+            if plan.initialized:
+                plan.destroy()
+        except Exception:
+            # clFFT must still be torn down, and nothing can be done about
+            # failures at exit
+            pass
     _teardown()
     global torn_down
     torn_down = True
@@ -251,6 +285,7 @@ class Plan(_Plan):
             raise clFFTError(_get_error_code(e))
 
         self.initialized = True
+        _live_plans.add(self)
 
     def __setattr__(self, __name, __value):
         try:
@@ -312,6 +347,31 @@ class Plan(_Plan):
 
         """  # noqa: E501
 
+        temp_buffer = None if temp is None else temp.data
+        direction = _FORWARD if forward else _BACKWARD
+
+        if isinstance(input, cla.Array) and (
+                output is None or isinstance(output, cla.Array)):
+            # fast path for single arrays, avoiding building lists
+            if wait_for is None:
+                wait_for = input.events
+            else:
+                wait_for = list(wait_for) + input.events
+            outputs = None if output is None else (output.base_data,)
+
+            try:
+                events = self.enqueue_transform(
+                    direction, (input.queue,), wait_for, (input.base_data,),
+                    outputs, temp_buffer)
+            except RuntimeError as e:
+                raise RuntimeError(_get_error_code(e))
+
+            input.add_event(events[0])
+            if output is not None:
+                output.add_event(events[0])
+
+            return events
+
         if isinstance(input, cla.Array):
             input = [input]
 
@@ -321,13 +381,11 @@ class Plan(_Plan):
         inputs = [ary.base_data for ary in input]
         outputs = None if output is None else [ary.base_data for ary in output]
 
-        wait_for = [] if wait_for is None else wait_for
+        wait_for = [] if wait_for is None else list(wait_for)
         for ary in input:
             wait_for.extend(ary.events)
 
         queues = [ary.queue for ary in input]
-        temp_buffer = None if temp is None else temp.data
-        direction = Direction.FORWARD if forward else Direction.BACKWARD
 
         try:
             events = self.enqueue_transform(
@@ -348,7 +406,6 @@ class Plan(_Plan):
         # apparently atexit-registered functions can be called before all plans
         # are garbage collected, so don't destroy the plan if clfftTearDown has
         # been called
-        global torn_down
         if self.initialized and not torn_down:
             try:
                 self.destroy()
@@ -356,12 +413,150 @@ class Plan(_Plan):
                 raise clFFTError(_get_error_code(e))
 
 
+def _make_plan(ctx, device, shape, nbatch, placeness, precision, layouts,
+               input_strides, output_strides, input_distance, output_distance,
+               scales, **kwargs):
+    plan = Plan(ctx, len(shape), shape[::-1])
+    plan.batch_size = nbatch
+    plan.placeness = placeness
+    plan.input_strides = input_strides
+    plan.output_strides = output_strides
+    plan.input_distance = input_distance
+    plan.output_distance = output_distance
+    plan.precision = precision
+    plan.input_layout, plan.output_layout = layouts
+    if scales is not None:
+        plan.forward_scale, plan.backward_scale = scales
+    for key, value in kwargs.items():
+        setattr(plan, key, value)
+
+    # bake last, since setting any parameter "unbakes" the plan
+    plan.bake(cl.CommandQueue(ctx, device))
+    return plan
+
+
+_plan_cache_size = int(os.environ.get("PYCL_FFT_PLAN_CACHE_SIZE", "16"))
+_get_plan = lru_cache(maxsize=_plan_cache_size)(_make_plan)
+_plan_cache_lock = threading.Lock()
+
+
+def clear_plan_cache():
+    """
+    Clear the cache of :class:`Plan`\\ s shared between
+    :class:`~pycl_fft.clfft.Transform`\\ s with identical plan parameters,
+    and release the scratch buffers they share.
+    """
+
+    _get_plan.cache_clear()
+    _work_areas.clear()
+
+
+def plan_cache_info():
+    """
+    :returns: The :func:`~functools.lru_cache` statistics of the plan cache.
+    """
+
+    return _get_plan.cache_info()
+
+
+_work_areas = {}
+_work_area_size_limit = None
+_OUT_OF_ORDER = cl.command_queue_properties.OUT_OF_ORDER_EXEC_MODE_ENABLE
+
+
+def set_work_area_size_limit(nbytes):
+    """
+    Set the maximum size (in bytes) of the scratch buffer shared by
+    :class:`~pycl_fft.clfft.Transform`\\ s on each
+    :class:`pyopencl.CommandQueue`.
+    Plans requiring more scratch space than this fall back to letting |clfft|_
+    allocate their own, as do transforms on out-of-order queues (for which
+    scratch buffers are never shared).
+    Defaults to *None* (no limit).
+    """
+
+    global _work_area_size_limit
+    _work_area_size_limit = nbytes
+
+
+def _get_work_area(queue, nbytes):
+    # transforms enqueued to the same (in-order) queue execute in order, so they
+    # may all share one scratch buffer. those on out-of-order queues could
+    # overlap, so clFFT manages their scratch space instead
+    if queue.properties & _OUT_OF_ORDER:
+        return None
+    if _work_area_size_limit is not None and nbytes > _work_area_size_limit:
+        return None
+
+    work_area = _work_areas.get(queue)
+    if work_area is None or work_area.nbytes < nbytes:
+        if work_area is not None:
+            # grow geometrically to limit reallocations
+            nbytes = max(nbytes, 2 * work_area.nbytes)
+            if _work_area_size_limit is not None:
+                nbytes = min(nbytes, _work_area_size_limit)
+        work_area = cla.empty(queue, nbytes, np.uint8)
+        _work_areas[queue] = work_area
+
+    return work_area
+
+
 def to_no_offset(ary):
     return ary._new_with_changes(data=ary.base_data[ary.offset:], offset=0)
 
 
-@lru_cache
-class Transform:
+def _without_offset(ary, copy):
+    # clFFT takes no offsets, so arrays with nonzero offset are passed as
+    # sub-buffers of their memory. Memory which can't be sliced into sub-buffers
+    # (e.g., pyopencl's PooledBuffers) is instead staged through a new array
+    # (into which ary is copied if copy is True)
+    if ary.offset == 0:
+        return ary
+    elif isinstance(ary.base_data, cl.Buffer):
+        return to_no_offset(ary)
+    elif copy:
+        return ary.copy()
+    else:
+        return cla.empty_like(ary)
+
+
+# (input, output) layouts for each type of transform
+_layouts = {
+    "c2c": (Layout.COMPLEX_INTERLEAVED, Layout.COMPLEX_INTERLEAVED),
+    "r2c": (Layout.REAL, Layout.HERMITIAN_INTERLEAVED),
+    "c2r": (Layout.HERMITIAN_INTERLEAVED, Layout.REAL),
+}
+
+_precisions = {
+    np.dtype("float32"): Precision.SINGLE,
+    np.dtype("complex64"): Precision.SINGLE,
+    np.dtype("float64"): Precision.DOUBLE,
+    np.dtype("complex128"): Precision.DOUBLE,
+}
+
+
+class _TransformCache(type):
+    # caches instances keyed on their normalized arguments, so that equivalent
+    # calls (e.g., passing dtype as a str or a numpy.dtype, or shape as a list)
+    # share a single Transform (and __init__ only runs for new ones)
+
+    def __init__(cls, name, bases, namespace):
+        super().__init__(name, bases, namespace)
+        get_instance = lru_cache(maxsize=128)(super().__call__)
+        cls._get_instance = get_instance
+        cls.cache_info = get_instance.cache_info
+        cls.cache_clear = get_instance.cache_clear
+
+    def __call__(cls, ctx: cl.Context, shape: tuple, dtype, type="c2c",
+                 in_place: bool = False, axes: tuple = None, nbatch: int = 1,
+                 norm: str = None, **kwargs):
+        return cls._get_instance(
+            ctx, tuple(shape), np.dtype(dtype), type, in_place,
+            None if axes is None else tuple(axes), nbatch, norm,
+            **dict(sorted(kwargs.items())))
+
+
+class Transform(BatchedTransformMixIn, metaclass=_TransformCache):
     """
     :arg ctx: A :class:`pyopencl.Context`.
 
@@ -380,8 +575,7 @@ class Transform:
     :arg in_place: Whether to overwrite output in the supplied input array.
         Defaults to *False*.
         Note that out-of-place transforms require an additional array to hold the
-        output (and that out-of-place complex-to-real transforms require another
-        temporary array on top of that).
+        output.
 
     :arg nbatch: The number of batches for batched transforms.
         Defaults to ``1``.
@@ -395,6 +589,16 @@ class Transform:
     :meth:`Transform`\\ 's initialization, which could lead to invalid
     configurations or unexpected results.
 
+    The plan is baked (for the first device of ``ctx``) upon initialization;
+    plans for any other devices of ``ctx`` are created and baked upon first use.
+    Unless keyword arguments are passed, the :class:`~pycl_fft.clfft.Plan`\\ s
+    are shared (via a cache, see :func:`clear_plan_cache`) by all
+    :class:`Transform`\\ s with identical parameters, so ``plan`` should be
+    treated as read-only: any changes to its parameters would apply to (and
+    "unbake") every such :class:`Transform`'s plan.
+    Customize plans by passing keyword arguments instead, which gives the
+    :class:`Transform` its own plans.
+
     .. automethod:: __call__
 
     :meth:`forward` and :meth:`backward` are convenience wrappers to
@@ -402,6 +606,7 @@ class Transform:
 
     .. automethod:: forward
     .. automethod:: backward
+    .. automethod:: from_batched
     """
 
     def __init__(self, ctx: cl.Context, shape: tuple, dtype, type="c2c",
@@ -412,71 +617,93 @@ class Transform:
             # is unsupported. only present as a check for input from the
             # high-level interface
             raise ValueError(
-                "clFFT only supports batching over the first axis.")
+                "clFFT only supports batching over leading axes.")
 
-        self.plan = Plan(ctx, len(shape), shape[::-1])
+        try:
+            layouts = _layouts[type]
+        except KeyError:
+            raise ValueError(f"Transforms of type {type} are unsupported.")
+        if type != "c2c" and shape[-1] % 2:
+            # the strides of the real array are computed assuming even lengths
+            raise ValueError(
+                f"{type} transforms with odd-length last axis are unsupported.")
 
-        self.plan.batch_size = nbatch
+        dtype = np.dtype(dtype)
+        try:
+            precision = _precisions[dtype]
+        except KeyError:
+            raise NotImplementedError(f"Transforms for {dtype} are unsupported.")
 
-        self.in_place = in_place
-        if in_place:
-            self.plan.placeness = ResultLocation.INPLACE
+        if norm == "forward":
+            scales = (1 / math.prod(shape), 1)
+        elif norm == "backward":
+            scales = (1, 1 / math.prod(shape))
+        elif norm is None:
+            scales = (1, 1)
         else:
-            self.plan.placeness = ResultLocation.OUTOFPLACE
+            scales = None
 
-        self.separate_buffer_required = (type == "c2r") and (not in_place)
+        self.in_place = in_place
 
-        cshape = get_r2c_output_shape(shape)  # shape arg excludes padding
-        rshape = get_c2r_output_shape(cshape, in_place)  # accounts for padding
-        if type == "c2c":
-            self.plan.input_strides = get_c_strides(shape)[::-1]
-            self.plan.output_strides = get_c_strides(shape)[::-1]
-            self.plan.input_distance = np.prod(shape)
-            self.plan.output_distance = np.prod(shape)
-        elif type == "r2c":
-            self.plan.input_strides = get_c_strides(rshape)[::-1]
-            self.plan.output_strides = get_c_strides(cshape)[::-1]
-            self.plan.input_strides = self.plan.input_strides
-            self.plan.input_distance = np.prod(rshape)
-            self.plan.output_distance = np.prod(cshape)
-        elif type == "c2r":
-            self.plan.input_strides = get_c_strides(cshape)[::-1]
-            self.plan.output_strides = get_c_strides(rshape)[::-1]
-            self.plan.input_distance = np.prod(cshape)
-            self.plan.output_distance = np.prod(rshape)
+        # clFFT allocates and manages any scratch space it needs itself
+        self.separate_buffer_required = False
+
+        self._ctx = ctx
+        self._shape = tuple(shape)
+        self._type = type
+        self._nbatch = nbatch
+        self._precision = precision
+        self._layouts = layouts
+        self._scales = scales
+        self._kwargs = kwargs
+        # plans are baked for a specific device; only query the device of each
+        # call's queue if there is more than one
+        self._device = ctx.devices[0] if len(ctx.devices) == 1 else None
+
+        # in- and out-of-place transforms (and those on different devices)
+        # require separate plans, which are only created if called for
+        self._plans = {}
+        self.plan = self._get_plan_for(in_place, ctx.devices[0])
+
+    def _get_plan_for(self, in_place, device):
+        try:
+            return self._plans[in_place, device]
+        except KeyError:
+            pass
 
-        dtype = np.dtype(dtype)
-        if dtype in (np.float64, np.complex128):
-            self.plan.precision = Precision.DOUBLE
-        elif dtype in (np.float32, np.complex64):
-            self.plan.precision = Precision.SINGLE
+        if in_place:
+            placeness = ResultLocation.INPLACE
         else:
-            raise NotImplementedError(f"Transforms for {dtype} are unsupported.")
+            placeness = ResultLocation.OUTOFPLACE
 
-        if type == "c2c":
-            self.plan.input_layout = Layout.COMPLEX_INTERLEAVED
-            self.plan.output_layout = Layout.COMPLEX_INTERLEAVED
-        elif type == "r2c":
-            self.plan.input_layout = Layout.REAL
-            self.plan.output_layout = Layout.HERMITIAN_INTERLEAVED
-        elif type == "c2r":
-            self.plan.input_layout = Layout.HERMITIAN_INTERLEAVED
-            self.plan.output_layout = Layout.REAL
+        shape = self._shape
+        cshape = get_r2c_output_shape(shape)  # shape arg excludes padding
+        rshape = get_c2r_output_shape(cshape, in_place)  # accounts for padding
+        if self._type == "c2c":
+            input_shape, output_shape = shape, shape
+        elif self._type == "r2c":
+            input_shape, output_shape = rshape, cshape
+        elif self._type == "c2r":
+            input_shape, output_shape = cshape, rshape
+
+        args = (self._ctx, device, shape, self._nbatch, placeness,
+                self._precision, self._layouts,
+                get_reversed_c_strides(input_shape),
+                get_reversed_c_strides(output_shape),
+                math.prod(input_shape), math.prod(output_shape), self._scales)
+
+        if self._kwargs:
+            # plans with user-specified attributes are not shared
+            plan = _make_plan(*args, **self._kwargs)
         else:
-            raise ValueError(f"Transforms of type {type} are unsupported.")
-
-        if norm == "forward":
-            self.plan.forward_scale = 1 / np.product(shape)
-            self.plan.backward_scale = 1
-        elif norm == "backward":
-            self.plan.forward_scale = 1
-            self.plan.backward_scale = 1 / np.product(shape)
-        elif norm is None:
-            self.plan.forward_scale = 1
-            self.plan.backward_scale = 1
+            # lru_cache doesn't prevent concurrent misses for the same arguments,
+            # so serialize lookups to avoid threads each creating and baking the
+            # same plan
+            with _plan_cache_lock:
+                plan = _get_plan(*args)
 
-        for key, value in kwargs.items():
-            setattr(self.plan, key, value)
+        self._plans[in_place, device] = plan
+        return plan
 
     def __call__(self, forward: bool, input: cla.Array, output: cla.Array = None,
                  temp: cla.Array = None):
@@ -488,43 +715,63 @@ class Transform:
 
         :arg output: The output array for the transform.
             Required if ``in_place == False``.
+            If ``output`` is the same array as ``input``, an in-place transform is
+            performed (and vice versa), regardless of ``in_place``.
 
         :arg temp: A scratch/temporary array.
-            Required (and only used) for out-of-place c2r transforms.
+            Never required.
 
         :returns: The :class:`~pyopencl.array.Array` holding the output for
-            the given transform.
+            the given transform, i.e., ``input`` for in-place transforms and
+            ``output`` otherwise (which is written to directly, so the return
+            value may be ignored).
 
         .. note::
 
-            If a temporary buffer is required by |clfft|_, it will allocate
-            and manage one itself if it is not supplied via ``temp``.
+            If a temporary buffer is required by |clfft|_ and not supplied via
+            ``temp``, one shared by all :class:`~pycl_fft.clfft.Transform`\\ s
+            on ``input``'s queue is used (see :func:`set_work_area_size_limit`),
+            unless that queue is out-of-order.
+
+        .. note::
+
+            Arrays with nonzero offsets are passed to |clfft|_ as subbuffers
+            (see :meth:`Plan.__call__`), except for those whose memory cannot be
+            divided into subbuffers (e.g., :class:`pyopencl.tools.PooledBuffer`\\ s
+            from a :class:`pyopencl.tools.MemoryPool`), which are instead
+            copied to and from temporary arrays.
         """
 
-        if not self.in_place:
-            if output is None:
+        if output is None:
+            in_place = self.in_place
+            if not in_place:
                 raise TypeError(
                     "Transform.__call__() missing argument output that is "
                     "required for out-of-place transforms.")
-
-            # if self.separate_buffer_required and not forward:
-                # if temp is None:
-                #         raise TypeError(
-                #             "Transform.__call__() missing argument buffer that is"
-                #             "required for out-of-place c2r transforms.")
-
-        if input.offset != 0:
-            _input = to_no_offset(input)
         else:
-            _input = input
-        if output is not None and output.offset != 0:
-            _output = to_no_offset(output)
+            in_place = is_in_place(input, output)
+        device = self._device or input.queue.device
+        plan = self._get_plan_for(in_place, device)
+
+        _input = _without_offset(input, copy=True)
+        if in_place:
+            _output = None if output is None else _input
         else:
-            _output = output
+            _output = _without_offset(output, copy=False)
+
+        if temp is None:
+            temp_buffer_size = plan.temp_buffer_size
+            if temp_buffer_size > 0:
+                temp = _get_work_area(input.queue, temp_buffer_size)
+
+        plan(forward, _input, _output, temp)
 
-        self.plan(forward, _input, _output, temp)
+        result, _result = (input, _input) if in_place else (output, _output)
+        if result.offset != 0 and not isinstance(result.base_data, cl.Buffer):
+            # copy back results staged through a new array
+            result[...] = _result
 
-        return input if self.in_place else output  # FIXME: no return?
+        return result
 
     def forward(self, input: cla.Array, output: cla.Array = None,
                 temp: cla.Array = None):
@@ -548,6 +795,9 @@ __all__ = [
     "CallbackType",
     "teardown",
     "setup_data",
+    "clear_plan_cache",
+    "plan_cache_info",
+    "set_work_area_size_limit",
     "__version__",
     "Transform",
 ]
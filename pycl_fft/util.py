@@ -21,7 +21,12 @@ THE SOFTWARE.
 """
 
 
+from math import prod
+from functools import lru_cache
+from itertools import accumulate
+from operator import mul
 import numpy as np
+import pyopencl as cl
 
 
 r2c_dtype_map = {
@@ -36,29 +41,53 @@ c2r_dtype_map = {
 
 
 def get_r2c_output_shape(shape, in_place=False):
-    shape = list(shape)
+    # shape may be passed as any sequence, so normalize for the cache
+    return _get_r2c_output_shape(tuple(shape), in_place)
+
+
+@lru_cache(maxsize=256)
+def _get_r2c_output_shape(shape, in_place):
+    n = shape[-1]
     if in_place:
+        if n % 2:
+            raise ValueError(
+                "The last axis of padded arrays for in-place real-to-complex "
+                f"transforms must have even length (got {n}).")
         # r array is padded by 2 in the last dimension
-        shape[-1] -= 2
-    # FIXME: odd shapes
-    shape[-1] = shape[-1] // 2 + 1
-    return tuple(shape)
+        n -= 2
+    return shape[:-1] + (n // 2 + 1,)
 
 
 def get_c2r_output_shape(shape, in_place=False):
-    shape = list(shape)
-    # FIXME: odd shapes
-    shape[-1] = 2 * (shape[-1] - 1)
-    if in_place:
-        shape[-1] += 2
-    return tuple(shape)
+    return _get_c2r_output_shape(tuple(shape), in_place)
+
+
+@lru_cache(maxsize=256)
+def _get_c2r_output_shape(shape, in_place):
+    # FIXME: odd shapes (the output length is ambiguous)
+    return shape[:-1] + (2 * shape[-1] - (0 if in_place else 2),)
 
 
 def get_c_strides(shape):
-    strides = [1]
-    for s in shape[:0:-1]:
-        strides.append(strides[-1] * max(1, s))
-    return tuple(strides[::-1])
+    return _get_c_strides(tuple(shape))
+
+
+@lru_cache(maxsize=128)
+def _get_c_strides(shape):
+    return _get_reversed_c_strides(shape)[::-1]
+
+
+def get_reversed_c_strides(shape):
+    # strides of a C-contiguous array ordered from the fastest- to the
+    # slowest-varying axis (as clFFT expects)
+    return _get_reversed_c_strides(tuple(shape))
+
+
+@lru_cache(maxsize=128)
+def _get_reversed_c_strides(shape):
+    if any(n <= 0 for n in shape):
+        raise ValueError(f"Array axes must have positive length (got {shape}).")
+    return tuple(accumulate(shape[:0:-1], mul, initial=1))
 
 
 def is_in_place(x, y):
@@ -67,11 +96,39 @@ def is_in_place(x, y):
     return (x.base_data == y.base_data) and (x.offset == y.offset)
 
 
+class BatchedTransformMixIn:
+    """
+    Provides :meth:`from_batched` to the :class:`Transform`\\ s of each backend.
+    """
+
+    @classmethod
+    def from_batched(cls, ctx: cl.Context, shape: tuple, dtype,
+                     batch_axes: tuple = (0,), **kwargs):
+        """
+        Creates a :class:`Transform` over the trailing axes of arrays of
+        ``shape``, performed for every index of the leading ``batch_axes``
+        (which must be ``(0, 1, ...)``) by a single batched launch.
+        Prefer this to transforming each slice of such arrays separately.
+
+        Any remaining keyword arguments are passed to :class:`Transform`.
+        """
+
+        nbatch_axes = len(batch_axes)
+        if tuple(batch_axes) != tuple(range(nbatch_axes)):
+            raise ValueError("Only leading axes may be batched over.")
+
+        shape = tuple(shape)
+        return cls(ctx, shape[nbatch_axes:], dtype,
+                   nbatch=prod(shape[:nbatch_axes]), **kwargs)
+
+
 __all__ = [
     "r2c_dtype_map",
     "c2r_dtype_map",
     "get_r2c_output_shape",
     "get_c2r_output_shape",
     "get_c_strides",
+    "get_reversed_c_strides",
     "is_in_place",
+    "BatchedTransformMixIn",
 ]
@@ -21,16 +21,26 @@ THE SOFTWARE.
 """
 
 
+import os
+import time
+import hashlib
+import weakref
+import threading
+from collections import OrderedDict, namedtuple
 from functools import lru_cache
+from itertools import accumulate
+from operator import mul
 import numpy as np
 import pyopencl as cl
 import pyopencl.array as cla
-from pycl_fft.util import get_r2c_output_shape
+from pycl_fft.util import (
+    BatchedTransformMixIn, get_r2c_output_shape, is_in_place)
 from pycl_fft._vkfft import (
     Configuration as _Configuration,
     LaunchParams as _LaunchParams,
     Result,
-    Application as _Application)
+    Application as _Application,
+    __version__)
 
 import logging
 logger = logging.getLogger(__name__)
@@ -44,19 +54,45 @@ __doc__ = """
 
     and then set all attributes manually.
 
-.. autoclass:: Application(configuration: Configuration)
+.. autoclass:: Application(configuration, application_string=None)
 
     :meth:`__init__` wraps :func:`initializeVkFFT`.
     Propagates and raises any exceptions from unsuccessful
     initializations.
+    If ``application_string`` is passed, the application is loaded from
+    these binaries (as previously returned by :meth:`get_application_string`)
+    rather than compiled (i.e., ``loadApplicationFromString`` is enabled).
     Its :meth:`__del__` method calls :func:`deleteVkFFT` (invoked automatically by
     Python's garbage collector).
 
     .. automethod:: append
 
+    .. method:: get_application_string()
+
+        :returns: The compiled binaries of an application initialized with
+            ``saveApplicationToString`` enabled as :class:`bytes`
+            (or *None* otherwise).
+
 .. autoclass:: LaunchParams
 
 .. class:: Result()
+
+Transform cache
+---------------
+
+:class:`Transform`\\ s are held in a least-recently-used cache of (by default)
+32 instances, each of which holds an :class:`Application` (and references to
+the :class:`pyopencl.Context` it was created for).
+
+.. autofunction:: set_transform_cache_size
+.. autofunction:: clear_transform_cache
+
+To avoid compiling the same applications in every process, set the environment
+variable ``PYCL_FFT_VKFFT_CACHE_DIR`` to a directory in which to store their
+binaries.
+Binaries are keyed on the device, driver and |vkfft|_ versions, and the
+arguments passed to :class:`Transform` (except for those with any additional
+keyword arguments, which are never stored).
 """
 
 
@@ -64,6 +100,24 @@ class ApplicationInitializationError(RuntimeError):
     pass
 
 
+# the pyopencl objects that VkFFT wrapper objects may hold pointers to
+_cl_reference_types = (
+    cl.Context, cl.CommandQueue, cl.Device, cl.Platform, cl.MemoryObjectHolder,
+    cla.Array)
+
+
+# attributes which are never pyopencl objects, set frequently enough (e.g., by
+# Transform) to skip the type check
+_never_mirrored = frozenset({
+    "FFTdim", "size", "numberBatches", "omitDimension", "doublePrecision",
+    "normalize", "performR2C", "performDCT", "isInputFormatted",
+    "isOutputFormatted", "specifyOffsetsAtLaunch", "inputBufferStride",
+    "bufferStride", "outputBufferStride", "makeForwardPlanOnly",
+    "makeInversePlanOnly", "bufferOffset", "inputBufferOffset",
+    "outputBufferOffset", "tempBufferOffset", "kernelOffset", "initialized",
+})
+
+
 class PyOpenCLReferenceHandlingMixIn:
     """
     Currently, Python can/will garbage collect any :mod:`pyopencl` even if any of
@@ -80,15 +134,21 @@ class PyOpenCLReferenceHandlingMixIn:
     to PyOpenCL objects over the duration of their lifetime.
     """
 
+    # subclasses declare slots for the references they may hold (i.e., for their
+    # attributes which are pyopencl objects)
+    __slots__ = ()
+
     def __setattr__(self, key, val):
-        # FIXME: this is a little slow
-        if getattr(val, "__module__", None) in ("pyopencl._cl", "pyopencl.array"):
+        if key not in _never_mirrored and isinstance(val, _cl_reference_types):
             super().__setattr__(f"_py_{key}", val)
         super().__setattr__(key, val)
 
 
 class Configuration(_Configuration, PyOpenCLReferenceHandlingMixIn):
-    pass
+    __slots__ = (
+        "_py_platform", "_py_device", "_py_context", "_py_commandQueue",
+        "_py_buffer", "_py_tempBuffer", "_py_inputBuffer", "_py_outputBuffer",
+        "_py_kernel")
 
 
 class LaunchParams(_LaunchParams, PyOpenCLReferenceHandlingMixIn):
@@ -100,13 +160,22 @@ class LaunchParams(_LaunchParams, PyOpenCLReferenceHandlingMixIn):
 
     and then set all attributes manually.
     """
-    pass
+
+    __slots__ = (
+        "_py_commandQueue", "_py_buffer", "_py_tempBuffer", "_py_inputBuffer",
+        "_py_outputBuffer", "_py_kernel")
 
 
 class Application(_Application, PyOpenCLReferenceHandlingMixIn):
-    def __init__(self, configuration: Configuration):
+    __slots__ = ("initialized",)
+
+    def __init__(self, configuration: Configuration,
+                 application_string: bytes = None):
         try:
-            super().__init__(configuration)
+            if application_string is None:
+                super().__init__(configuration)
+            else:
+                super().__init__(configuration, application_string)
         except RuntimeError as e:
             self.initialized = False
             raise ApplicationInitializationError(Result(int(e.args[0])).name)
@@ -114,7 +183,9 @@ class Application(_Application, PyOpenCLReferenceHandlingMixIn):
         self.initialized = True
 
     def __del__(self):
-        if self.initialized:
+        # initialized is unset if __init__ raised anything else (e.g., for
+        # invalid arguments)
+        if getattr(self, "initialized", False):
             # only call deleteVkFFT if application creation was successful;
             # otherwise, VkFFT has already done so and calling deleteVkFFT again
             # leads to bus errors
@@ -131,8 +202,189 @@ class Application(_Application, PyOpenCLReferenceHandlingMixIn):
             raise RuntimeError(res.name)
 
 
-@lru_cache
-class Transform:
+# querying a context's devices calls into the OpenCL runtime, so remember the
+# device used for each context (without keeping the context alive)
+_first_devices = weakref.WeakKeyDictionary()
+
+
+def _get_first_device(ctx):
+    try:
+        return _first_devices[ctx]
+    except KeyError:
+        device = _first_devices[ctx] = ctx.devices[0]
+        return device
+
+
+_binary_cache_dir = os.environ.get("PYCL_FFT_VKFFT_CACHE_DIR")
+
+
+def _get_binary_cache_path(device, *args):
+    key = (device.platform.name, device.name, device.driver_version,
+           __version__) + args
+    digest = hashlib.sha256(repr(key).encode()).hexdigest()
+    return os.path.join(_binary_cache_dir, f"{digest}.bin")
+
+
+def _load_application(config, cache_path):
+    if cache_path is None:
+        return Application(config)
+
+    try:
+        with open(cache_path, "rb") as f:
+            application_string = f.read()
+    except OSError:
+        pass
+    else:
+        try:
+            return Application(config, application_string)
+        except ApplicationInitializationError:
+            logger.info(f"Could not load binaries from {cache_path}; recompiling.")
+
+    config.saveApplicationToString = True
+    app = Application(config)
+
+    application_string = app.get_application_string()
+    if application_string is not None:
+        try:
+            os.makedirs(_binary_cache_dir, exist_ok=True)
+            # write to a temporary file first so that concurrent processes never
+            # read partial binaries
+            tmp_path = f"{cache_path}.{os.getpid()}"
+            with open(tmp_path, "wb") as f:
+                f.write(application_string)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write binaries to {cache_path}: {e}")
+
+    return app
+
+
+_transform_cache_size = 32
+
+
+# the Configuration attributes to set for each type of transform
+_type_attributes = {
+    "c2c": {},
+    "r2c": {"performR2C": True},
+    "c2r": {"performR2C": True},
+    **{dct_type: {"performDCT": dct_type} for dct_type in range(1, 5)},
+}
+
+_double_precision = {
+    np.dtype("float32"): False,
+    np.dtype("complex64"): False,
+    np.dtype("float64"): True,
+    np.dtype("complex128"): True,
+}
+
+
+@lru_cache(maxsize=128)
+def _get_buffer_strides(shape):
+    # VkFFT's buffer strides are the cumulative products of the (reversed) shape
+    return tuple(accumulate(shape[::-1], mul))
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class _TransformCache(type):
+    # caches instances keyed on their arguments in a bounded least-recently-used
+    # cache, so that transforms (and the Applications and references to OpenCL
+    # objects they hold) which fall out of use are eventually released; unlike
+    # with functools.lru_cache, entries can also be dropped for one context
+
+    def __init__(cls, name, bases, namespace):
+        super().__init__(name, bases, namespace)
+        cls._instances = OrderedDict()
+        cls._maxsize = _transform_cache_size
+        cls._hits = cls._misses = 0
+        # serialize misses so that concurrent threads don't each create the
+        # same Application
+        cls._lock = threading.Lock()
+
+    def __call__(cls, ctx: cl.Context, shape: tuple, dtype, type="c2c",
+                 in_place: bool = False, axes: tuple = None, nbatch: int = 1,
+                 norm: bool = False, **kwargs):
+        # normalize arguments so that equivalent calls (e.g., passing shape as a
+        # list or dtype as a str) share a Transform; VkFFT only uses axes to
+        # determine which dimensions to omit, so their order doesn't matter, and
+        # transforming all axes is the same as passing None
+        shape = tuple(shape)
+        if axes is not None:
+            axes = tuple(sorted(axes))
+            if axes == tuple(range(len(shape))):
+                axes = None
+        dtype = np.dtype(dtype)
+        kwargs = dict(sorted(kwargs.items()))
+        key = (ctx, shape, dtype, type, in_place, axes, nbatch, norm,
+               tuple(kwargs.items()))
+
+        with cls._lock:
+            try:
+                instance = cls._instances[key]
+            except KeyError:
+                pass
+            else:
+                cls._hits += 1
+                cls._instances.move_to_end(key)
+                return instance
+
+            cls._misses += 1
+            instance = super().__call__(
+                ctx, shape, dtype, type, in_place, axes, nbatch, norm, **kwargs)
+            cls._instances[key] = instance
+            cls._evict()
+            return instance
+
+    def _evict(cls):
+        if cls._maxsize is not None:
+            while len(cls._instances) > cls._maxsize:
+                cls._instances.popitem(last=False)
+
+    def _set_cache_size(cls, maxsize):
+        with cls._lock:
+            cls._maxsize = maxsize
+            cls._evict()
+
+    def cache_info(cls):
+        return CacheInfo(cls._hits, cls._misses, cls._maxsize, len(cls._instances))
+
+    def cache_clear(cls, ctx: cl.Context = None):
+        with cls._lock:
+            if ctx is None:
+                cls._instances.clear()
+                cls._hits = cls._misses = 0
+            else:
+                for key in [key for key in cls._instances if key[0] == ctx]:
+                    del cls._instances[key]
+
+
+def set_transform_cache_size(maxsize):
+    """
+    Set the maximum number of :class:`Transform`\\ s (and hence
+    :class:`Application`\\ s) to cache (32 by default), evicting the least
+    recently used ones as necessary.
+    Pass *None* for an unbounded cache.
+    """
+
+    Transform._set_cache_size(maxsize)
+
+
+def clear_transform_cache(ctx: cl.Context = None):
+    """
+    Clear the cache of :class:`Transform`\\ s.
+    Their :class:`Application`\\ s are deleted once no other references to them
+    remain.
+
+    :arg ctx: If not *None*, only clear the :class:`Transform`\\ s for this
+        :class:`pyopencl.Context` (whose references to it prevent it from being
+        released).
+    """
+
+    Transform.cache_clear(ctx)
+
+
+class Transform(BatchedTransformMixIn, metaclass=_TransformCache):
     """
     :arg ctx: A :class:`pyopencl.Context`.
 
@@ -146,7 +398,9 @@ class Transform:
         discrete cosine transforms).
         Note that out-of-place real-to-complex and complex-to-real transforms
         require separate :class:`~pycl_fft.vkfft.Application`\\ s because the
-        number of buffers required and their strides differ.
+        number of buffers required and their strides differ
+        (so out-of-place ``"r2c"`` and ``"c2r"`` transforms only support forward
+        and backward transforms, respectively).
 
     :arg in_place: Whether to overwrite output in the supplied input array.
         Defaults to *False*.
@@ -165,10 +419,27 @@ class Transform:
         Defaults to *False*.
 
     Any remaining keyword arguments are set as attributes to the
-    :class:`~pycl_fft.vkfft.Configuration`.
+    :class:`~pycl_fft.vkfft.Configuration`
+    (and a :class:`TypeError` is raised for any which are not attributes of
+    :class:`~pycl_fft.vkfft.Configuration`, e.g., if misspelled).
     Note that this allows one to overwrite any values previously set by
     :meth:`Transform`\\ 's initialization, which could lead to invalid
     configurations or unexpected results.
+    For example, arrays whose axes are padded (which can avoid memory-channel
+    conflicts for large, power-of-two strides) may be transformed by passing
+    their strides as ``bufferStride`` (and ``inputBufferStride`` and
+    ``outputBufferStride`` for out-of-place transforms).
+    As for ``size``, |vkfft|_ expects these in reverse order and as the number
+    of elements spanned by each axis along with all faster-varying axes
+    (i.e., the cumulative products of the padded shape).
+
+    Keyword arguments may also set parameters of the kernels |vkfft|_
+    generates which it does not tune automatically, for example, ``useLUT``
+    (to use look-up tables rather than computing twiddle factors on the fly),
+    ``registerBoost``, ``registerBoost4Step``, ``coalescedMemory``,
+    ``warpSize``, and ``maxCodeLength``.
+    Consult the |vkfft|_ documentation for their meanings and defaults, and see
+    :meth:`autotune` to choose among a set of candidate values.
 
     .. automethod:: __call__
 
@@ -177,6 +448,9 @@ class Transform:
 
     .. automethod:: forward
     .. automethod:: backward
+    .. automethod:: from_batched
+    .. automethod:: autotune
+    .. automethod:: append_many
     """
 
     def __init__(self, ctx: cl.Context, shape: tuple, dtype, type="c2c",
@@ -198,16 +472,22 @@ class Transform:
 
         logger.info(f"Initializing Transform with {type=}, {shape=}, {in_place=}.")
 
+        try:
+            type_attributes = _type_attributes[type]
+        except KeyError:
+            raise ValueError(f"Transforms of type {type} are unsupported.")
+
         self.config = Configuration()
         self.config.FFTdim = len(shape)
         self.config.size = shape[::-1]
         self.config.numberBatches = nbatch
         if axes is not None:
-            if type in ("r2c", "c2r") and len(shape) - 1 not in axes:
+            axes_set = set(axes)
+            if "performR2C" in type_attributes and len(shape) - 1 not in axes_set:
                 raise ValueError(
                     "VkFFT does not support omitting last axis of "
                     f"{type} transforms.")
-            omit_dims = [int(i not in axes) for i in range(len(shape))][::-1]
+            omit_dims = [int(i not in axes_set) for i in range(len(shape))][::-1]
             self.config.omitDimension = omit_dims
 
         self.config.specifyOffsetsAtLaunch = True
@@ -217,47 +497,67 @@ class Transform:
 
         if not in_place:
             self.config.isInputFormatted = True
-            cshape = get_r2c_output_shape(shape)[::-1]
+            strides = _get_buffer_strides(shape)
+            cstrides = _get_buffer_strides(get_r2c_output_shape(shape))
             if type == "c2c":
-                self.config.inputBufferStride = np.cumprod(self.config.size)
-                self.config.bufferStride = np.cumprod(self.config.size)
+                self.config.inputBufferStride = strides
+                self.config.bufferStride = strides
             elif type == "r2c":
-                self.makeForwardPlanOnly = True
-                self.config.inputBufferStride = np.cumprod(self.config.size)
-                self.config.bufferStride = np.cumprod(cshape)
+                self.config.makeForwardPlanOnly = True
+                self.config.inputBufferStride = strides
+                self.config.bufferStride = cstrides
             elif type == "c2r":
-                self.makeInversePlanOnly = True
-                self.config.inputBufferStride = np.cumprod(cshape)
-                self.config.bufferStride = np.cumprod(cshape)
+                self.config.makeInversePlanOnly = True
+                self.config.inputBufferStride = cstrides
+                self.config.bufferStride = cstrides
                 self.config.isOutputFormatted = True
-                self.config.outputBufferStride = np.cumprod(self.config.size)
+                self.config.outputBufferStride = strides
 
         dtype = np.dtype(dtype)
-        if dtype in (np.float64, np.complex128):
-            self.config.doublePrecision = True
-        elif dtype not in (np.float32, np.complex64):
+        try:
+            self.config.doublePrecision = _double_precision[dtype]
+        except KeyError:
             raise NotImplementedError(f"Transforms for {dtype} are unsupported.")
 
-        if type in ("r2c", "c2r"):
-            self.config.performR2C = True
-        elif type in range(1, 5):
-            self.config.performDCT = type
-        elif type != "c2c":
-            raise ValueError(f"Transforms of type {type} are unsupported.")
+        for key, value in type_attributes.items():
+            setattr(self.config, key, value)
 
         self.config.normalize = norm
 
         self.config.context = ctx
-        self.config.device = ctx.devices[0]
+        device = _get_first_device(ctx)
+        self.config.device = device
 
         for key, value in kwargs.items():
+            # catch misspelled attributes, which would otherwise be silently
+            # ignored by VkFFT
+            if not hasattr(_Configuration, key):
+                raise TypeError(
+                    f"Transform() got an unexpected keyword argument {key!r} "
+                    "(which is not an attribute of Configuration).")
             setattr(self.config, key, value)
 
-        self.app = Application(self.config)
+        cache_path = None
+        if _binary_cache_dir is not None and not kwargs:
+            cache_path = _get_binary_cache_path(
+                device, shape, dtype, type, in_place, axes, nbatch,
+                norm)
+        self.app = _load_application(self.config, cache_path)
+
+        # the buffers to pass are fixed for each direction
+        if in_place:
+            bind_forward = bind_backward = self._bind_in_place
+        elif self.separate_buffer_required:
+            bind_forward = self._bind_out_of_place
+            bind_backward = self._bind_separate_output
+        else:
+            bind_forward = bind_backward = self._bind_out_of_place
+        self._bind_buffers = {True: bind_forward, False: bind_backward}
 
     def __call__(self, forward, input: cla.Array, output: cla.Array = None,
                  temp: cla.Array = None, _temp: cla.Array = None,
-                 kernel: cla.Array = None):
+                 kernel: cla.Array = None, wait_for: list = None,
+                 synchronize: bool = True):
         """
         :arg forward: Whether to do a forward (*True*) or backward (*False*)
             transform.
@@ -270,6 +570,12 @@ class Transform:
         :arg temp: A scratch/temporary array.
             Required (and only used) for out-of-place c2r transforms.
 
+        :arg wait_for: A list of additional :class:`pyopencl.Event`\\ s to wait
+            for before performing the transform.
+
+        :arg synchronize: Whether to block until the transform completes.
+            Defaults to *True*; see below.
+
         :returns: The :class:`~pyopencl.array.Array` holding the output for
             the given transform.
 
@@ -282,41 +588,23 @@ class Transform:
 
         .. note::
 
-            Until |vkfft|_ implements event handling, this method enforces
-            synchronization by calling
+            Until |vkfft|_ implements event handling, this method by default
+            enforces synchronization by calling
             :meth:`pyopencl.CommandQueue.finish`\\ for the ``input`` array's
             queue before and after invoking the transform.
+            Passing ``synchronize=False`` instead enqueues a barrier on the
+            events of the passed arrays and records a marker event for the
+            transform on each of them, so that the host need not wait.
+            The transform is then only ordered with respect to commands that
+            are enqueued to the ``input`` array's queue or that wait on these
+            arrays' events.
         """
 
-        # FIXME: optimize pars creation
+        # LaunchParams are created for each call (rather than reused) because
+        # Transforms are shared between threads
         pars = LaunchParams()
         pars.commandQueue = input.queue
-
-        if self.in_place:
-            pars.buffer = input.base_data
-            pars.bufferOffset = input.offset
-        else:
-            pars.inputBuffer = input.base_data
-            pars.inputBufferOffset = input.offset
-
-            if output is None:
-                raise TypeError(
-                    "Transform.__call__() missing argument output that is "
-                    "required for out-of-place transforms.")
-
-            if self.separate_buffer_required and not forward:
-                pars.outputBuffer = output.base_data
-                pars.outputBufferOffset = output.offset
-                if temp is not None:
-                    pars.buffer = temp.base_data
-                    pars.bufferOffset = temp.offset
-                else:
-                    raise TypeError(
-                        "Transform.__call__() missing argument temp that is"
-                        "required for out-of-place c2r transforms.")
-            else:
-                pars.buffer = output.base_data
-                pars.bufferOffset = output.offset
+        self._bind_buffers[forward](pars, input, output, temp)
 
         if _temp is not None:
             pars.tempBuffer = _temp.data
@@ -326,21 +614,215 @@ class Transform:
             pars.kernelOffset = kernel.offset
 
         direction = -1 if forward else 1
-        input.finish()  # FIXME: pass wait_for to VkFFT
-        self.app.append(direction, pars)
-        input.queue.finish()  # FIXME: events in VkFFT
+        if synchronize:
+            # VkFFT's OpenCL backend doesn't take wait lists (nor return events)
+            if wait_for:
+                cl.wait_for_events(wait_for)
+            input.finish()
+            self.app.append(direction, pars)
+            input.queue.finish()
+        else:
+            arrays = [ary for ary in (input, output, temp) if ary is not None]
+            wait_for = list(wait_for or []) + [
+                evt for ary in arrays for evt in ary.events]
+            if wait_for:
+                cl.enqueue_barrier(input.queue, wait_for=wait_for)
+            self.app.append(direction, pars)
+            evt = cl.enqueue_marker(input.queue)
+            for ary in arrays:
+                ary.add_event(evt)
 
         return input if self.in_place else output  # FIXME: no return?
 
+    def append_many(self, forward, inputs, outputs=None, temps=None,
+                    wait_for=None, synchronize: bool = True):
+        """
+        Performs the transform on each of a sequence of arrays, synchronizing
+        only once (rather than before and after each transform, as
+        :meth:`__call__` does).
+        (For arrays which are contiguous slices of a larger array, prefer a
+        single batched transform; see :meth:`from_batched`.)
+
+        :arg forward: Whether to do forward (*True*) or backward (*False*)
+            transforms.
+
+        :arg inputs: A sequence of input arrays, all of which (along with
+            ``outputs`` and ``temps``) must be associated with the same queue.
+
+        :arg outputs: A sequence of output arrays of the same length as
+            ``inputs``.
+            Required if ``in_place == False``.
+
+        :arg temps: A sequence of temporary arrays of the same length as
+            ``inputs``.
+            Required (and only used) for out-of-place c2r transforms.
+
+        :arg wait_for: A list of additional :class:`pyopencl.Event`\\ s to wait
+            for before performing any of the transforms.
+
+        :arg synchronize: Has the same meaning as for :meth:`__call__`.
+
+        :returns: A :class:`list` of the arrays holding the output of each
+            transform.
+        """
+
+        inputs = list(inputs)
+        outputs = [None] * len(inputs) if outputs is None else list(outputs)
+        temps = [None] * len(inputs) if temps is None else list(temps)
+        if not len(inputs) == len(outputs) == len(temps):
+            raise ValueError("inputs, outputs, and temps must have the same length.")
+        if not inputs:
+            return []
+
+        queue = inputs[0].queue
+        arrays = [ary for arys in (inputs, outputs, temps) for ary in arys
+                  if ary is not None]
+        wait_for = list(wait_for or []) + [
+            evt for ary in arrays for evt in ary.events]
+        if wait_for:
+            if synchronize:
+                cl.wait_for_events(wait_for)
+            else:
+                cl.enqueue_barrier(queue, wait_for=wait_for)
+
+        # as for __call__, LaunchParams aren't shared between calls
+        pars = LaunchParams()
+        pars.commandQueue = queue
+        bind_buffers = self._bind_buffers[forward]
+        direction = -1 if forward else 1
+        for input, output, temp in zip(inputs, outputs, temps):
+            bind_buffers(pars, input, output, temp)
+            self.app.append(direction, pars)
+
+        if synchronize:
+            queue.finish()
+        else:
+            evt = cl.enqueue_marker(queue)
+            for ary in arrays:
+                ary.add_event(evt)
+
+        return inputs if self.in_place else outputs
+
+    @staticmethod
+    def _bind_in_place(pars, input, output, temp):
+        pars.buffer = input.base_data
+        pars.bufferOffset = input.offset
+
+    @staticmethod
+    def _bind_out_of_place(pars, input, output, temp):
+        if output is None:
+            raise TypeError(
+                "Transform.__call__() missing argument output that is "
+                "required for out-of-place transforms.")
+
+        pars.inputBuffer = input.base_data
+        pars.inputBufferOffset = input.offset
+        pars.buffer = output.base_data
+        pars.bufferOffset = output.offset
+
+    @staticmethod
+    def _bind_separate_output(pars, input, output, temp):
+        if output is None:
+            raise TypeError(
+                "Transform.__call__() missing argument output that is "
+                "required for out-of-place transforms.")
+        if temp is None:
+            raise TypeError(
+                "Transform.__call__() missing argument temp that is "
+                "required for out-of-place c2r transforms.")
+
+        pars.inputBuffer = input.base_data
+        pars.inputBufferOffset = input.offset
+        pars.outputBuffer = output.base_data
+        pars.outputBufferOffset = output.offset
+        pars.buffer = temp.base_data
+        pars.bufferOffset = temp.offset
+
     def forward(self, input: cla.Array, output: cla.Array = None,
                 temp: cla.Array = None, _temp: cla.Array = None,
-                kernel: cla.Array = None):
-        return self(True, input, output, temp=temp, _temp=_temp, kernel=kernel)
+                kernel: cla.Array = None, wait_for: list = None,
+                synchronize: bool = True):
+        return self(True, input, output, temp=temp, _temp=_temp, kernel=kernel,
+                    wait_for=wait_for, synchronize=synchronize)
 
     def backward(self, input: cla.Array, output: cla.Array = None,
                  temp: cla.Array = None, _temp: cla.Array = None,
-                 kernel: cla.Array = None):
-        return self(False, input, output, temp=temp, _temp=_temp, kernel=kernel)
+                 kernel: cla.Array = None, wait_for: list = None,
+                 synchronize: bool = True):
+        return self(False, input, output, temp=temp, _temp=_temp, kernel=kernel,
+                    wait_for=wait_for, synchronize=synchronize)
+
+    @classmethod
+    def autotune(cls, ctx: cl.Context, shape: tuple, dtype, input: cla.Array,
+                 output: cla.Array = None, temp: cla.Array = None,
+                 candidates=(), forward: bool = True, nruns: int = 10, **kwargs):
+        """
+        Creates a :class:`Transform` for each set of ``candidates`` (along with
+        one with |vkfft|_'s defaults) and times each performing the transform
+        on arrays like the given ones.
+        The transforms are timed on copies of ``input`` and on scratch arrays
+        allocated with ``input``'s allocator, so none of the passed arrays are
+        modified.
+
+        :arg input: An input array for the transform.
+
+        :arg output: An output array for the transform.
+            Required if ``in_place == False``.
+
+        :arg temp: A scratch/temporary array.
+            Required (and only used) for out-of-place c2r transforms.
+
+        :arg candidates: A sequence of :class:`dict`\\ s of attributes of the
+            :class:`~pycl_fft.vkfft.Configuration`, e.g.,
+            ``[{"useLUT": True}, {"registerBoost": 2}]``.
+            Candidates for which the :class:`Application` cannot be initialized
+            are skipped.
+
+        :arg forward: Whether to time forward (*True*) or backward (*False*)
+            transforms.
+
+        :arg nruns: The number of transforms to time for each candidate.
+
+        Any remaining keyword arguments are passed to :class:`Transform`.
+        Note that every candidate :class:`Transform` is created (and cached)
+        as usual.
+
+        :returns: The fastest :class:`Transform`.
+        """
+
+        # don't overwrite the caller's arrays
+        allocator = input.allocator
+        _input = input.copy()
+        if output is None:
+            _output = None
+        elif is_in_place(input, output):
+            _output = _input
+        else:
+            _output = cla.empty_like(output, input.queue, allocator)
+        _temp = (None if temp is None
+                 else cla.empty_like(temp, input.queue, allocator))
+
+        best_transform, best_time = None, float("inf")
+        for candidate in [{}] + list(candidates):
+            try:
+                transform = cls(ctx, shape, dtype, **kwargs, **candidate)
+            except ApplicationInitializationError as e:
+                logger.info(f"Skipping {candidate=}: {e}.")
+                continue
+
+            # exclude any one-time setup from the timing
+            transform(forward, _input, _output, temp=_temp)
+
+            start = time.perf_counter()
+            for _ in range(nruns):
+                transform(forward, _input, _output, temp=_temp)
+            elapsed = time.perf_counter() - start
+
+            logger.info(f"{candidate=}: {elapsed / nruns:.3e} s per transform.")
+            if elapsed < best_time:
+                best_transform, best_time = transform, elapsed
+
+        return best_transform
 
 
 __all__ = [
@@ -349,4 +831,6 @@ __all__ = [
     "LaunchParams",
     "Result",
     "Transform",
+    "set_transform_cache_size",
+    "clear_transform_cache",
 ]
@@ -81,6 +81,26 @@ VkFFTApplication* init_application(const VkFFTConfiguration* config)
     return app;
 }
 
+VkFFTApplication* init_application_from_string(const VkFFTConfiguration* config,
+                                               py::bytes application_string)
+{
+    // VkFFT only reads the binaries during initialization, so the string need
+    // not outlive this call
+    std::string str = application_string;
+    VkFFTConfiguration load_config = *config;
+    load_config.saveApplicationToString = 0;
+    load_config.loadApplicationFromString = 1;
+    load_config.loadApplicationString = (void*) str.data();
+    return init_application(&load_config);
+}
+
+py::object get_application_string(const VkFFTApplication* app)
+{
+    if (app->saveApplicationString == 0) return py::none();
+    return py::bytes((const char*) app->saveApplicationString,
+                     app->applicationStringSize);
+}
+
 PYBIND11_MODULE(_vkfft, m)
 {
     {
@@ -179,7 +199,9 @@ PYBIND11_MODULE(_vkfft, m)
         typedef VkFFTApplication cls;
         py::class_<cls>(m, "Application")
             .def(py::init(&init_application))
+            .def(py::init(&init_application_from_string))
             .def("append", VkFFTAppend)
+            .def("get_application_string", get_application_string)
             .def("delete", deleteVkFFT)
         ;
     }
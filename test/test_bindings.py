@@ -76,6 +76,22 @@ def test_vkfft_bindings(ctx_factory):
     err = get_rerr(y, ary.get())
     assert err < 1e-10, err
 
+    # check that applications can be loaded from saved binaries
+    assert app.get_application_string() is None
+    c.saveApplicationToString = True
+    app = Application(c)
+    application_string = app.get_application_string()
+    assert application_string
+
+    c.saveApplicationToString = False
+    app = Application(c, application_string)
+    ary[:] = x
+    app.append(-1, pars)
+    queue.finish()
+
+    err = get_rerr(y, ary.get())
+    assert err < 1e-10, err
+
 
 def test_clfft_bindings(ctx_factory):
     import pycl_fft.clfft as clf
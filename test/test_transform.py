@@ -21,6 +21,8 @@ THE SOFTWARE.
 """
 
 
+from functools import lru_cache
+from math import prod
 import numpy as np
 import scipy.fft as sp  # pylint: disable=E0611
 import pyopencl as cl
@@ -32,9 +34,91 @@ from pyopencl.tools import (  # noqa
     pytest_generate_tests_for_pyopencl as pytest_generate_tests)
 
 
+# creating a context for every test case is slow (and pyopencl's ctx_factory
+# also garbage collects upon each call), so share one context and queue per device
+# across tests
+_contexts = {}
+_queues = {}
+
+
+@pytest.fixture
+def ctx(ctx_factory):
+    device = ctx_factory.device
+    if device not in _contexts:
+        _contexts[device] = ctx_factory()
+    return _contexts[device]
+
+
+@pytest.fixture
+def queue(ctx):
+    if ctx not in _queues:
+        _queues[ctx] = cl.CommandQueue(ctx)
+    return _queues[ctx]
+
+
+# likewise, recycle device memory between tests rather than creating and
+# releasing buffers for each
+_allocators = {}
+
+
+@pytest.fixture
+def allocator(queue):
+    if queue not in _allocators:
+        from pyopencl.tools import MemoryPool, ImmediateAllocator
+        _allocators[queue] = MemoryPool(ImmediateAllocator(queue))
+    return _allocators[queue]
+
+
 def get_rerr(a, b):
-    err = np.abs(a / b - 1)
-    return np.max(err), np.average(err)
+    # |a / b - 1| = |a - b| / |b|, which avoids complex division (computed in
+    # place to avoid a temporary for each intermediate)
+    err = np.subtract(a, b)
+    err = np.abs(err, out=err if err.dtype.kind == "f" else None)
+    err /= np.abs(b)
+    return err.max(), err.mean()
+
+
+def check_rerr(a, b, max_rtol, avg_rtol):
+    # both reductions share a single pass computing the error array
+    max_err, avg_err = get_rerr(a, b)
+    assert avg_err < avg_rtol, avg_err
+    assert max_err < max_rtol, max_err
+    return max_err, avg_err
+
+
+# pycl_fft and SciPy forward and backward functions for each transform type
+transform_functions = {
+    "c2c": (clf.fftn, clf.ifftn, sp.fftn, sp.ifftn),  # pylint: disable=E1101
+    "r2c": (clf.rfftn, clf.irfftn, sp.rfftn, sp.irfftn),  # pylint: disable=E1101
+    **{typ: (clf.dctn, clf.idctn, sp.dctn, sp.idctn)  # pylint: disable=E1101
+       for typ in (1, 2, 3, 4)},
+}
+
+
+def get_call_kwargs(type):
+    return dict(type=type) if isinstance(type, int) else {}
+
+
+# reference transforms are computed in double precision and so don't depend on
+# the backend or precision being tested; since the parametrization varies those
+# slowest, cache every reference for the whole session
+@lru_cache(maxsize=None)
+def get_reference(shape, axes, type):
+    _, _, scipy_forward, scipy_backward = transform_functions[type]
+    call_kwargs = get_call_kwargs(type)
+
+    rng = np.random.default_rng(seed=979234)
+
+    x_h = rng.uniform(-1/2, 1/2, shape)
+    if type == "c2c":
+        x_h = x_h + 1j * rng.uniform(-1/2, 1/2, shape)
+    y_h = scipy_forward(x_h, **call_kwargs, axes=axes, norm="backward")
+    x_h_back = scipy_backward(y_h, **call_kwargs, axes=axes, norm="forward")
+
+    # cached arrays are shared between tests
+    for ary in (x_h, y_h, x_h_back):
+        ary.flags.writeable = False
+    return x_h, y_h, x_h_back
 
 
 precisions = ["single", "double"]
@@ -53,88 +137,99 @@ shapes_axes = [
     ((32, 48, 26), None),
     ((2, 8, 10, 4), (1, 2, 3)),
     ((2, 8, 10, 4), (1, 3)),
+    ((2, 8, 10, 4), (2, 3)),
     ((2, 8, 10, 4), (3,)),
 ]
 
 
-@pytest.mark.parametrize("shape, axes", shapes_axes)
+def get_shape_axes_id(shape, axes):
+    # e.g., "2x8x10x4-axes1_3", so that cases are easy to select with -k
+    shape_id = "x".join(map(str, shape))
+    if axes is None:
+        return shape_id
+    return shape_id + "-axes" + "_".join(map(str, axes))
+
+
+shapes_axes_ids = [get_shape_axes_id(*shape_axes) for shape_axes in shapes_axes]
+
+
+@pytest.mark.parametrize("shape, axes", shapes_axes, ids=shapes_axes_ids)
 @pytest.mark.parametrize("precision", precisions)
 @pytest.mark.parametrize("backend, type", backends_types)
-def test_transforms(ctx_factory, shape, axes, precision, type, backend):
-    # the Transform cache hangs on to contexts, which pile up when running pytest
-    # and exceed OpenCL limits on simultaneous contexts as well as RAM
-    clf.clear_cache()  # pylint: disable=E1101
-    clf.set_backend(backend)
-
-    # pylint is unhappy with scipy.fft
-    # pylint: disable=E1101
+def test_transforms(ctx, queue, allocator, shape, axes, precision, type, backend):
+    from pyopencl.characterize import has_double_support
+    if precision == "double" and not has_double_support(ctx.devices[0]):
+        pytest.skip("device does not support double precision")
 
-    ctx = ctx_factory()
-    queue = cl.CommandQueue(ctx)
+    # contexts are shared between tests, so the (bounded) Transform caches need
+    # not be cleared to avoid piling up contexts
+    clf.set_backend(backend)
 
     nbits = {"single": 32, "double": 64}[precision]
     if type == "c2c":
-        dtype = np.dtype(f"complex{2*nbits}")
-        y_dtype = dtype
-        forward = clf.fftn
-        backward = clf.ifftn
-        scipy_forward = sp.fftn
-        scipy_backward = sp.ifftn
-        call_kwargs = {}
-    else:
+        dtype = y_dtype = np.dtype(f"complex{2*nbits}")
+    elif type == "r2c":
+        from pycl_fft import r2c_dtype_map
         dtype = np.dtype(f"float{nbits}")
-        if type == "r2c":
-            from pycl_fft import r2c_dtype_map
-            y_dtype = r2c_dtype_map[dtype]
-            forward = clf.rfftn
-            backward = clf.irfftn
-            scipy_forward = sp.rfftn
-            scipy_backward = sp.irfftn
-            call_kwargs = {}
-        else:
-            y_dtype = dtype
-            forward = clf.dctn
-            backward = clf.idctn
-            scipy_forward = sp.dctn
-            scipy_backward = sp.idctn
-            call_kwargs = dict(type=type)
-    call_kwargs["axes"] = axes
-
-    print(f"{type=}, dtype={dtype.name}, {shape=}, {axes=}, {backend=}")
+        y_dtype = r2c_dtype_map[dtype]
+    else:
+        dtype = y_dtype = np.dtype(f"float{nbits}")
 
-    rng = np.random.default_rng(seed=979234)
+    forward, backward, _, _ = transform_functions[type]
+    call_kwargs = dict(get_call_kwargs(type), axes=axes)
 
-    x_h = rng.uniform(-1/2, 1/2, shape)
-    if dtype.kind == "c":
-        x_h = x_h + 1j * rng.uniform(-1/2, 1/2, shape)
-    # compute reference transforms in double precision
-    y_h = scipy_forward(x_h, **call_kwargs, norm="backward")
+    x_h, y_h, x_h_back = get_reference(shape, axes, type)
+
+    # each slot is a view into its own buffer with an offset of zero, of the
+    # device's base address alignment, or of one (misaligned) element
+    # (these aren't allocated from the memory pool, as clFFT is only passed
+    # sub-buffers for offset arrays with non-pooled memory)
+    align = ctx.devices[0].mem_base_addr_align // 8
+
+    def make_slots(shape, dtype):
+        slots = []
+        for offset in (0, align, dtype.itemsize):
+            pad = offset // dtype.itemsize
+            base = cla.empty(queue, (pad + prod(shape),), dtype)
+            slots.append(base[pad:].reshape(shape))
+        return slots
 
-    x = cla.empty(queue, (3,)+shape, dtype)
-    y = cla.empty(queue, (3,)+y_h.shape, y_dtype)
+    xs = make_slots(shape, dtype)
+    ys = make_slots(y_h.shape, y_dtype)
 
     # for invalid axes specification, check that unsupported configs raise
     # and return early
     if backend == "clfft" and axes is not None:
-        if len(shape) == 4:
-            valid_axes = ((1, 2, 3),)
-        else:
-            all = tuple(range(len(shape)))
-            valid_axes = (all, all[1:])
-        if axes not in valid_axes:
+        # leading axes are batched over, so clFFT supports any trailing axes
+        if axes != tuple(range(len(shape) - len(axes), len(shape))):
             with pytest.raises(ValueError):
-                out = forward(x[0], **call_kwargs)
+                out = forward(xs[0], **call_kwargs)
             with pytest.raises(ValueError):
-                out = backward(y[0], **call_kwargs)
+                out = backward(ys[0], **call_kwargs)
             return
     if type in ("c2r", "r2c") and axes is not None:
         if len(shape) - 1 not in axes:
             with pytest.raises(ValueError):
-                out = forward(x[0], **call_kwargs)
+                out = forward(xs[0], **call_kwargs)
             with pytest.raises(ValueError):
-                out = backward(y[0], **call_kwargs)
+                out = backward(ys[0], **call_kwargs)
             return
 
+    # enqueue uploads without blocking so that they overlap with host work
+    # (pyopencl keeps the host arrays alive until the copies complete)
+    x_h_typed = x_h.astype(dtype)
+    y_h_typed = y_h.astype(y_dtype)
+    xs[0].set(x_h_typed, async_=True)
+    x_d = cla.to_device(queue, x_h_typed, allocator=allocator, async_=True)
+    y_d = cla.to_device(queue, y_h_typed, allocator=allocator, async_=True)
+
+    # for r2c, the real array for in-place transforms is padded by 2 in the last
+    # axis
+    pad = 2 if type == "r2c" else 0
+    x_h_pad = np.pad(x_h_typed, [(0, 0)]*(len(shape)-1) + [(0, pad)])
+    slc = (slice(None),)*(len(shape)-1) + (slice(shape[-1]),)
+    x_pad = cla.to_device(queue, x_h_pad, allocator=allocator, async_=True)
+
     # forward transforms
 
     max_rtol = 1e-10 if precision == "double" else 1e-2
@@ -144,64 +239,56 @@ def test_transforms(ctx_factory, shape, axes, precision, type, backend):
         max_rtol *= 1e3
 
     # test automatic construction of required arrays
-    x[0] = x_h.astype(dtype)
-    out = forward(x[0], **call_kwargs)
-    max_err, avg_err = get_rerr(out.get(), y_h)
+    out = forward(xs[0], **call_kwargs)
+    y_ref = out.get()
+    max_err, avg_err = check_rerr(y_ref, y_h, max_rtol, avg_rtol)
     print(f"forward:\t{max_err=:.3e}\t{avg_err=:.3e}")
-    assert avg_err < avg_rtol, avg_err
-    assert max_err < max_rtol, max_err
 
     # test offsets: compare to CL result and test with lower tols
-    y_ref = out.get()
     max_rtol = 1e-14 if precision == "double" else 1e-6
     avg_rtol = 1e-15 if precision == "double" else 1e-7
 
     def offset_aligned(ary):
-        align = ctx.devices[0].mem_base_addr_align // 8
         return ary.offset % align == 0
 
     def invalid_offset_check(x, y):
         return backend == "clfft" and not (offset_aligned(x) and offset_aligned(y))
 
-    for ix in range(x.shape[0]):
-        for iy in range(y.shape[0]):
-            x[:] = 0
-            y[:] = 0
-            x[ix] = x_h.astype(dtype)
-
-            if invalid_offset_check(x[ix], y[iy]):
-                continue
-
-            _ = forward(x[ix], y[iy], **call_kwargs)
-            max_err, avg_err = get_rerr(y_ref, y[iy].get())
-            assert avg_err < avg_rtol, avg_err
-            assert max_err < max_rtol, max_err
+    def check_offsets(transform, srcs, dsts, src_d, ref, max_rtol, avg_rtol):
+        # enqueue all offset transforms (and non-blocking reads of their results
+        # into a single host array) and only then synchronize
+        # only the input slot holds data, and output slots are reset so they
+        # can't retain a previous iteration's result
+        for src in srcs:
+            src.fill(0)
+        results = np.empty((len(srcs) * len(dsts),)+ref.shape, ref.dtype)
+        nresults = 0
+        for src in srcs:
+            for dst in dsts:
+                if invalid_offset_check(src, dst):
+                    continue
+
+                src[...] = src_d
+                dst.fill(0)
+
+                _ = transform(src, dst, **call_kwargs)
+                dst.get_async(ary=results[nresults])
+                nresults += 1
+            src.fill(0)
+
+        queue.finish()
+        for result in results[:nresults]:
+            check_rerr(ref, result, max_rtol, avg_rtol)
+
+    check_offsets(forward, xs, ys, x_d, y_ref, max_rtol, avg_rtol)
 
     # test in-place
-    slc = [slice(None)]*len(shape)
-    if type == "r2c":
-        in_shape = list(shape)
-        in_shape[-1] += 2
-        in_shape = tuple(in_shape)
-        slc[-1] = slice(-2)
-    else:
-        in_shape = shape[:]
-    slc = tuple(slc)
-
-    x_h_pad = np.zeros(in_shape, dtype)
-    x_h_pad[slc] = x_h
-    x_pad = cla.to_device(queue, x_h_pad)
-
     # transform returns proper view of x_pad
-    x_pad = forward(x_pad, x_pad, **call_kwargs)
-    max_err, avg_err = get_rerr(y_ref, x_pad.get())
-    assert avg_err < avg_rtol, avg_err
-    assert max_err < max_rtol, max_err
+    y_pad = forward(x_pad, x_pad, **call_kwargs)
+    check_rerr(y_ref, y_pad.get(), max_rtol, avg_rtol)
 
     # backward transforms
 
-    x_h = scipy_backward(y_h, **call_kwargs, norm="forward")
-
     max_rtol = 1e-10 if precision == "double" else 1e-2
     avg_rtol = 1e-12 if precision == "double" else 1e-4
     if type != "c2c":
@@ -211,39 +298,23 @@ def test_transforms(ctx_factory, shape, axes, precision, type, backend):
         avg_rtol *= 10
 
     # test automatic construction of required arrays
-    y[0] = y_h.astype(y_dtype)
-    out = backward(y[0], **call_kwargs)
-    max_err, avg_err = get_rerr(out.get(), x_h)
+    ys[0].set(y_h_typed, async_=True)
+    out = backward(ys[0], **call_kwargs)
+    x_ref = out.get()
+    max_err, avg_err = check_rerr(x_ref, x_h_back, max_rtol, avg_rtol)
     print(f"backward\t{max_err=:.3e}\t{avg_err=:.3e}\n")
-    assert avg_err < avg_rtol, avg_err
-    assert max_err < max_rtol, max_err
 
     # test offsets: compare to CL result and test with lower tols
-    x_ref = out.get()
     max_rtol = 1e-14 if precision == "double" else 1e-5
     avg_rtol = 1e-15 if precision == "double" else 1e-6
 
-    for ix in range(x.shape[0]):
-        for iy in range(y.shape[0]):
-            x[:] = 0
-            y[:] = 0
-            y[iy] = y_h.astype(y_dtype)
-
-            if invalid_offset_check(x[ix], y[iy]):
-                continue
-
-            _ = backward(y[iy], x[ix], **call_kwargs)
-            max_err, avg_err = get_rerr(x_ref, x[ix].get())
-            assert max_err < max_rtol, max_err
-            assert avg_err < avg_rtol, avg_err
+    check_offsets(backward, ys, xs, y_d, x_ref, max_rtol, avg_rtol)
 
     # test in-place
-    x_pad[...] = y_h.astype(y_dtype)
-    # transform returns proper view of x_pad
-    x_pad = backward(x_pad, x_pad, **call_kwargs)
-    max_err, avg_err = get_rerr(x_ref, x_pad.get()[slc])
-    assert avg_err < avg_rtol, avg_err
-    assert max_err < max_rtol, max_err
+    y_pad.set(y_h_typed, async_=True)
+    # transform returns proper view of y_pad (i.e., x_pad)
+    x_pad_out = backward(y_pad, in_place=True, **call_kwargs)
+    check_rerr(x_ref, x_pad_out.get()[slc], max_rtol, avg_rtol)
 
     # import gc
     # print(gc.get_referrers(ctx))
@@ -301,19 +372,265 @@ def test_caching(ctx_factory, backend):
     assert get_misses() == 4
     assert get_hits() == 4
 
+    # equivalent arguments map onto the same cache entry
+    _ = Transform(ctx, [8], "complex128", norm=1)
+    assert get_misses() == 4
+    assert get_hits() == 5
+
+    if backend == "vkfft":
+        # entries can be dropped for a single context
+        other_ctx = cl.Context(ctx.devices)
+        _ = Transform(other_ctx, (8,), np.dtype("complex128"))
+        assert Transform.cache_info().currsize == 5
+        clf.vkfft.clear_transform_cache(other_ctx)
+        assert Transform.cache_info().currsize == 4
+
     clf.clear_cache()  # from previous tests
     assert get_misses() == 0
     assert get_hits() == 0
 
 
-if __name__ == "__main__":
-    context = cl.create_some_context()
+def test_plan_caching(ctx_factory):
+    # pylint: disable=E1101
+    ctx = ctx_factory()
+
+    clf.clear_cache()  # from previous tests
+    Transform = clf.clfft.Transform
+
+    # Transforms which differ only in arguments that don't affect the plan
+    # share one
+    t1 = Transform(ctx, (8, 4), np.dtype("complex128"))
+    t2 = Transform(ctx, (8, 4), np.dtype("complex128"), axes=(0, 1))
+    assert t1 is not t2
+    assert t1.plan is t2.plan
+    assert clf.clfft.plan_cache_info().misses == 1
+    assert clf.clfft.plan_cache_info().hits == 1
+
+    # plans are baked upon construction (temp_buffer_size is unavailable otherwise)
+    assert t1.plan.temp_buffer_size >= 0
+
+    t3 = Transform(ctx, (8, 4), np.dtype("complex128"), in_place=True)
+    assert t3.plan is not t1.plan
+
+    # passing output=input dispatches to (the shared) in-place plan
+    queue = cl.CommandQueue(ctx)
+    x = cla.zeros(queue, (8, 4), np.dtype("complex128"))
+    assert t1.forward(x, x) is x
+    assert t1._plans[True, queue.device] is t3.plan
+
+    # plans with user-specified attributes aren't shared
+    t4 = Transform(ctx, (8, 4), np.dtype("complex128"), batch_size=1)
+    assert t4.plan is not t1.plan
 
-    for backend, type in backends_types:
-        for shape, axes in shapes_axes:
-            for precision in precisions:
-                test_transforms(
-                    lambda: context, shape, axes, precision, type, backend)
+    clf.clear_cache()
+    assert clf.clfft.plan_cache_info().currsize == 0
 
-    for backend in ["clfft", "vkfft"]:
-        test_caching(lambda: context, backend)
+
+def test_clfft_work_areas(ctx_factory):
+    # pylint: disable=E1101
+    ctx = ctx_factory()
+    clf.clear_cache()
+
+    # transforms on the same in-order queue share a scratch buffer
+    queue = cl.CommandQueue(ctx)
+    work_area = clf.clfft._get_work_area(queue, 64)
+    assert clf.clfft._get_work_area(queue, 32) is work_area
+
+    # but those on out-of-order queues could run concurrently
+    props = cl.command_queue_properties.OUT_OF_ORDER_EXEC_MODE_ENABLE
+    if ctx.devices[0].queue_properties & props:
+        ooo_queue = cl.CommandQueue(ctx, properties=props)
+        assert clf.clfft._get_work_area(ooo_queue, 64) is None
+
+    clf.clear_cache()
+
+
+def test_vkfft_unknown_kwargs(ctx_factory):
+    # pylint: disable=E1101
+    ctx = ctx_factory()
+
+    # misspelled Configuration attributes aren't silently ignored
+    with pytest.raises(TypeError, match="useLTU"):
+        clf.vkfft.Transform(ctx, (8,), np.dtype("complex128"), useLTU=1)
+
+    _ = clf.vkfft.Transform(ctx, (8,), np.dtype("complex128"), useLUT=1)
+
+
+def test_vkfft_autotune(ctx_factory):
+    # pylint: disable=E1101
+    ctx = ctx_factory()
+    queue = cl.CommandQueue(ctx)
+
+    rng = np.random.default_rng(seed=979234)
+    x = rng.random((16, 8)) + 1j * rng.random((16, 8))
+    x_d = cla.to_device(queue, x)
+    y_d = cla.zeros_like(x_d)
+
+    transform = clf.vkfft.Transform.autotune(
+        ctx, x.shape, x.dtype, x_d, y_d, candidates=[{"useLUT": 1}], nruns=2)
+    assert isinstance(transform, clf.vkfft.Transform)
+
+    # the passed arrays are left untouched
+    assert np.all(x_d.get() == x)
+    assert np.all(y_d.get() == 0)
+
+    # and so is the input of in-place transforms
+    clf.vkfft.Transform.autotune(
+        ctx, x.shape, x.dtype, x_d, x_d, in_place=True, nruns=2)
+    assert np.all(x_d.get() == x)
+
+
+def test_vkfft_binary_cache(ctx_factory, tmp_path, monkeypatch):
+    # pylint: disable=E1101
+    ctx = ctx_factory()
+    queue = cl.CommandQueue(ctx)
+
+    monkeypatch.setattr(clf.vkfft, "_binary_cache_dir", str(tmp_path))
+    clf.vkfft.clear_transform_cache()
+
+    rng = np.random.default_rng(seed=979234)
+    x = rng.random((16, 8)) + 1j * rng.random((16, 8))
+    x_d = cla.to_device(queue, x)
+    y_d = cla.empty_like(x_d)
+
+    # the first Transform compiles and saves its binaries, and the second
+    # (once evicted from the in-memory cache) loads them
+    for _ in range(2):
+        clf.vkfft.clear_transform_cache(ctx)
+        transform = clf.vkfft.Transform(ctx, x.shape, x.dtype)
+        assert len(list(tmp_path.glob("*.bin"))) == 1
+
+        y_d.fill(0)
+        transform.forward(x_d, y_d)
+        max_err, avg_err = get_rerr(np.fft.fftn(x), y_d.get())
+        assert max_err < 1e-10, max_err
+
+    clf.vkfft.clear_transform_cache()
+
+
+def test_vkfft_releases_arrays(ctx_factory):
+    # pylint: disable=E1101
+    ctx = ctx_factory()
+    queue = cl.CommandQueue(ctx)
+    from pyopencl.tools import MemoryPool, ImmediateAllocator
+    pool = MemoryPool(ImmediateAllocator(queue))
+
+    x = np.ones((16, 8), dtype="complex128")
+    transform = clf.vkfft.Transform(ctx, x.shape, x.dtype)
+
+    # cached Transforms mustn't keep the arrays they transformed alive
+    x_d = cla.to_device(queue, x, allocator=pool)
+    y_d = cla.empty_like(x_d)
+    transform.forward(x_d, y_d)
+    transform.append_many(False, [y_d], [x_d])
+    assert pool.active_blocks == 2
+    del x_d, y_d
+    assert pool.active_blocks == 0
+
+
+def test_clfft_pooled_offsets(ctx_factory):
+    # pylint: disable=E1101
+    ctx = ctx_factory()
+    queue = cl.CommandQueue(ctx)
+    from pyopencl.tools import MemoryPool, ImmediateAllocator, PooledBuffer
+    pool = MemoryPool(ImmediateAllocator(queue))
+
+    rng = np.random.default_rng(seed=979234)
+    x = rng.random((2, 16, 8)) + 1j * rng.random((2, 16, 8))
+    y = np.fft.fftn(x, axes=(1, 2))
+    x_d = cla.to_device(queue, x, allocator=pool)
+
+    # pooled buffers can't be divided into the subbuffers clFFT is passed for
+    # arrays with offsets
+    y_d = clf.fftn(x_d, allocator=pool, backend="clfft", axes=(1, 2))
+    assert isinstance(y_d.base_data, PooledBuffer)
+
+    # offset input
+    out = clf.ifftn(y_d[1], allocator=pool, backend="clfft")
+    max_err, avg_err = get_rerr(x[1], out.get())
+    assert max_err < 1e-10, max_err
+
+    # offset output (also pooled, as zeros_like uses y_d's allocator)
+    out = cla.zeros_like(y_d)
+    clf.fftn(x_d[1], out[1], backend="clfft")
+    max_err, avg_err = get_rerr(y[1], out[1].get())
+    assert max_err < 1e-10, max_err
+    assert np.all(out[0].get() == 0)
+
+    # offset in-place
+    clf.ifftn(y_d[1], in_place=True, backend="clfft")
+    max_err, avg_err = get_rerr(x[1], y_d[1].get())
+    assert max_err < 1e-10, max_err
+
+
+@pytest.mark.parametrize("backend", ["vkfft", "clfft"])
+def test_from_batched(ctx_factory, backend):
+    ctx = ctx_factory()
+    queue = cl.CommandQueue(ctx)
+
+    Transform = clf.get_transform_class(backend)
+    shape = (3, 2, 8, 4)
+    transform = Transform.from_batched(
+        ctx, shape, np.complex128, batch_axes=(0, 1))
+    assert transform is Transform(ctx, shape[2:], np.complex128, nbatch=6)
+
+    with pytest.raises(ValueError):
+        Transform.from_batched(ctx, shape, np.complex128, batch_axes=(1,))
+
+    rng = np.random.default_rng()
+    x = rng.random(shape) + 1j * rng.random(shape)
+    x_d = cla.to_device(queue, x)
+    y_d = cla.empty_like(x_d)
+    transform.forward(x_d, y_d)
+
+    max_err, avg_err = get_rerr(np.fft.fftn(x, axes=(2, 3)), y_d.get())
+    assert max_err < 1e-10, max_err
+
+
+@pytest.mark.parametrize("backend", ["clfft", "nonexistent"])
+def test_dct_backends(ctx_factory, backend):
+    ctx = ctx_factory()
+    queue = cl.CommandQueue(ctx)
+    x = cla.zeros(queue, (8,), np.float64)
+
+    # rejected without loading (or needing) other backends
+    for func in (clf.dctn, clf.idctn):  # pylint: disable=E1101
+        with pytest.raises(NotImplementedError):
+            func(x, backend=backend)
+
+
+def test_in_place_output(ctx_factory):
+    # pylint: disable=E1101
+    ctx = ctx_factory()
+    queue = cl.CommandQueue(ctx)
+    x = cla.zeros(queue, (8,), np.float64)
+    z = cla.zeros(queue, (8,), np.complex128)
+
+    # outputs other than the input aren't silently ignored
+    for func, ary in [(clf.fftn, z), (clf.ifftn, z), (clf.rfftn, x),
+                      (clf.irfftn, z), (clf.dctn, x), (clf.idctn, x)]:
+        with pytest.raises(ValueError):
+            func(ary, ary.copy(), in_place=True)
+
+
+@pytest.mark.parametrize("shape", [(7,), (4, 6), (3, 5, 2), (2, 8, 10, 4)])
+def test_strides(shape):
+    from pycl_fft.util import get_c_strides, get_reversed_c_strides
+
+    strides = tuple(s // 8 for s in np.empty(shape).strides)
+    assert get_c_strides(shape) == strides
+    assert get_reversed_c_strides(list(shape)) == strides[::-1]
+
+    # degenerate shapes fail loudly rather than giving zero strides
+    for bad_shape in [shape[:-1] + (0,), (-1,) + shape[1:]]:
+        for func in (get_c_strides, get_reversed_c_strides):
+            with pytest.raises(ValueError):
+                func(bad_shape)
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        exec(sys.argv[1])
+    else:
+        sys.exit(pytest.main([__file__]))